@@ -3,13 +3,29 @@ import time
 import sys
 import re
 import shutil
+import tempfile
 import subprocess
+import threading
+import multiprocessing
+import queue
+import socket
+import atexit
 import requests
 import json
+import hashlib
+import random
+import unicodedata
+import csv
+import wave
+import sqlite3
+from contextlib import closing, contextmanager
+from collections import deque
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 from PIL import Image
-import chardet
-from concurrent.futures import ThreadPoolExecutor
+from subtitles import SubtitleTrack, srt_file_to_text, sniff_encoding
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor, Future, as_completed,
+                                wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError)
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                             QHBoxLayout, QGridLayout, QLabel, QLineEdit,
                             QPushButton, QFileDialog, QTextEdit, QCheckBox,
@@ -17,7 +33,7 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                             QSplitter, QFrame, QScrollArea, QGroupBox, QDoubleSpinBox,
                             QMenu, QAction, QDialog, QFormLayout, QDialogButtonBox,
                             QStackedWidget, QTableWidget, QTableWidgetItem, QHeaderView)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QUrl, QSize
+from PyQt5.QtCore import Qt, QThread, QObject, pyqtSignal, QTimer, QUrl, QSize
 from PyQt5.QtGui import QFont, QIcon, QDesktopServices, QColor
 from qfluentwidgets import (FluentIcon, NavigationInterface, NavigationItemPosition,
                           FluentWindow, SubtitleLabel, BodyLabel, PrimaryPushButton,
@@ -34,16 +50,936 @@ LABEL_FONT.setPointSize(12)
 ENTRY_FONT = QFont()
 ENTRY_FONT.setPointSize(10)
 
+def get_cache_dir(*parts):
+    """缓存目录（工作目录下的 cache/），不存在时自动创建"""
+    path = os.path.join(os.getcwd(), 'cache', *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+_content_hash_memo = {}
+_content_hash_lock = threading.Lock()
+
+def file_content_hash(path, chunk_size=1 << 20):
+    """文件内容 SHA-256；同一 (路径, 大小, 修改时间) 在进程内只计算一次"""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _content_hash_lock:
+        if key in _content_hash_memo:
+            return _content_hash_memo[key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    with _content_hash_lock:
+        _content_hash_memo[key] = digest.hexdigest()
+    return digest.hexdigest()
+
+@contextmanager
+def atomic_write_path(path):
+    """原子写入：给出同目录下本进程本线程独有的临时路径，块正常结束后替换为 path；
+    出错或取消时删除临时文件，不会留下残缺的目标文件"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def evict_directory_lru(directory, max_bytes):
+    """目录总大小超过 max_bytes 时按修改时间从旧到新删除文件（命中时 touch 文件即可续期）"""
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue  # 其他线程刚刚删除
+        if os.path.isfile(path):
+            entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+class SQLiteStore:
+    """基于 SQLite 的小型持久化存储基类：每次操作独立连接，读写加锁"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        with self.lock, self.connect() as conn:
+            self.init_schema(conn)
+            conn.commit()
+
+    def connect(self):
+        return closing(sqlite3.connect(self.db_path, timeout=10))
+
+    def init_schema(self, conn):
+        raise NotImplementedError
+
+class MediaProbeCache(SQLiteStore):
+    """ffprobe 结果缓存，键为 (路径, 大小, 修改时间)，超出容量时按最近访问时间淘汰"""
+
+    def __init__(self, db_path, max_entries=5000):
+        self.max_entries = max_entries
+        super().__init__(db_path)
+
+    def init_schema(self, conn):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS media_probe ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime REAL, data TEXT, last_access REAL)"
+        )
+
+    def get(self, path, size, mtime):
+        with self.lock, self.connect() as conn:
+            row = conn.execute("SELECT size, mtime, data FROM media_probe WHERE path = ?", (path,)).fetchone()
+            if row is None or row[0] != size or row[1] != mtime:
+                return None
+            conn.execute("UPDATE media_probe SET last_access = ? WHERE path = ?", (time.time(), path))
+            conn.commit()
+        return json.loads(row[2])
+
+    def put(self, path, size, mtime, info):
+        with self.lock, self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO media_probe (path, size, mtime, data, last_access) VALUES (?, ?, ?, ?, ?)",
+                (path, size, mtime, json.dumps(info), time.time())
+            )
+            count = conn.execute("SELECT COUNT(*) FROM media_probe").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM media_probe WHERE path IN "
+                    "(SELECT path FROM media_probe ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            conn.commit()
+
+_probe_cache = None
+_probe_cache_lock = threading.Lock()
+
+def get_probe_cache():
+    """全局 ffprobe 缓存实例"""
+    global _probe_cache
+    with _probe_cache_lock:
+        if _probe_cache is None:
+            _probe_cache = MediaProbeCache(os.path.join(get_cache_dir(), "probe.sqlite3"))
+        return _probe_cache
+
+def _ffprobe_media(path):
+    """调用 ffprobe 读取时长与各流参数，失败返回 None"""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries",
+        "format=duration,format_name:stream=index,codec_type,codec_name,width,height,"
+        "time_base,r_frame_rate,pix_fmt,sample_rate,channels",
+        "-of", "json", path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        return None
+    fmt = data.get("format", {})
+    streams = data.get("streams", [])
+    if not fmt and not streams:
+        return None
+    try:
+        duration = float(fmt.get("duration"))
+    except (TypeError, ValueError):
+        duration = None
+    video = next((st for st in streams if st.get("codec_type") == "video"), {})
+    audio = next((st for st in streams if st.get("codec_type") == "audio"), {})
+    return {
+        "duration": duration,
+        "format": fmt.get("format_name"),
+        "streams": streams,
+        "video_codec": video.get("codec_name"),
+        "audio_codec": audio.get("codec_name"),
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "fps": video.get("r_frame_rate"),
+        "time_base": video.get("time_base"),
+        "pix_fmt": video.get("pix_fmt"),
+        "sample_rate": int(audio["sample_rate"]) if audio.get("sample_rate") else None,
+        "channels": audio.get("channels"),
+        "keyframes": None,
+    }
+
+def _ffprobe_keyframes(path):
+    """读取首个视频流的关键帧时间（秒）"""
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey",
+        "-show_entries", "frame=pts_time", "-of", "csv=p=0", path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    keyframes = []
+    for line in result.stdout.splitlines():
+        try:
+            keyframes.append(float(line.strip().strip(",")))
+        except ValueError:
+            continue
+    return keyframes
+
+def probe(path, keyframes=False):
+    """读取媒体信息（带持久化缓存），所有页面统一通过此接口探测媒体
+
+    返回字典：duration, format, streams, video_codec, audio_codec, width, height,
+    fps, time_base, pix_fmt, sample_rate, channels, keyframes（keyframes=True 时填充）。
+    文件不存在或无法解析时返回 None。
+    """
+    path = os.path.abspath(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    cache = get_probe_cache()
+    info = cache.get(path, st.st_size, st.st_mtime)
+    if info is None:
+        info = _ffprobe_media(path)
+        if info is None:
+            return None
+        cache.put(path, st.st_size, st.st_mtime, info)
+    if keyframes and info.get("keyframes") is None:
+        # 关键帧索引开销较大，按需计算后写回缓存
+        info["keyframes"] = _ffprobe_keyframes(path)
+        cache.put(path, st.st_size, st.st_mtime, info)
+    return info
+
+def probe_paths(paths, max_workers=8):
+    """并行探测多个文件，返回与 paths 顺序一致的结果列表"""
+    paths = list(paths)
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        return list(executor.map(probe, paths))
+
+def probe_folder(folder, extensions=None, max_workers=8):
+    """并行探测文件夹下的媒体文件，返回 {路径: 信息}"""
+    names = sorted(f for f in os.listdir(folder)
+                   if extensions is None or f.lower().endswith(tuple(extensions)))
+    paths = [os.path.join(folder, f) for f in names]
+    return dict(zip(paths, probe_paths(paths, max_workers)))
+
+def snap_to_keyframes(points, keyframes):
+    """把分割点移到最近的关键帧（去掉 0 和重复），没有关键帧索引时原样返回"""
+    if not keyframes:
+        return points
+    snapped = sorted({min(keyframes, key=lambda k: abs(k - p)) for p in points})
+    return [k for k in snapped if k > 0] or points
+
+def get_media_duration(path):
+    """获取媒体时长（秒），失败返回 None"""
+    info = probe(path)
+    return info["duration"] if info else None
+
+def write_concat_list(list_path, files):
+    """写入 ffmpeg concat 分离器使用的文件列表"""
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for fp in files:
+            escaped = fp.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+# 缩放动画质量/速度预设：(预放大倍数, 缩放算法)
+# 预放大越高，zoompan 裁剪窗口的取整误差越小，画面抖动越少，但计算量越大
+ZOOM_PRESETS = {
+    "速度优先": (1, "fast_bilinear"),
+    "均衡": (2, "bicubic"),
+    "质量优先": (3, "lanczos"),
+}
+
+def build_zoom_filter(filter_type, zoom_end, duration, fps, width, height, preset="均衡"):
+    """构造缩放合并使用的 -vf 滤镜，输出固定为 width x height、指定帧率的 yuv420p
+
+    filter_type:
+        scale+zoompan  zoompan 引擎：按帧号预先确定每帧裁剪窗口，缩放到固定输出尺寸
+        scale+zoom     旧版表达式（逐帧改变尺寸后裁剪），保留用于对比
+        其他           不做缩放动画，仅统一规格
+    """
+    normalize = (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                 f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1")
+    zoom_ratio = zoom_end - 1
+
+    if filter_type == "scale+zoompan":
+        factor, flags = ZOOM_PRESETS.get(preset, ZOOM_PRESETS["均衡"])
+        try:
+            num, den = (fps.split("/") + ["1"])[:2]
+            fps_value = float(num) / float(den)
+        except (AttributeError, ValueError, ZeroDivisionError):
+            fps_value = float(fps)
+        frames = max(2, int(round(duration * fps_value)))
+        # 第 on 帧的缩放倍数线性增长，裁剪窗口居中：x=(iw-iw/zoom)/2
+        return (
+            f"scale={width * factor}:{height * factor}:force_original_aspect_ratio=decrease:flags={flags},"
+            f"pad={width * factor}:{height * factor}:(ow-iw)/2:(oh-ih)/2,setsar=1,"
+            f"zoompan=z='1+{zoom_ratio:.4f}*on/{frames - 1}':x='(iw-iw/zoom)/2':y='(ih-ih/zoom)/2'"
+            f":d=1:s={width}x{height}:fps={fps},setsar=1,format=yuv420p"
+        )
+    if filter_type == "scale+zoom":
+        return (f"scale=iw*(1+{zoom_ratio}*t/{duration}):ih*(1+{zoom_ratio}*t/{duration}),"
+                f"crop=iw:ih,{normalize},fps={fps},format=yuv420p")
+    return f"{normalize},fps={fps},format=yuv420p"
+
+class FFmpegRunner:
+    """ffmpeg 运行器：通过 -progress pipe:1 流式读取进度，stderr 只保留有限的尾部"""
+
+    STDERR_TAIL_LINES = 40
+    EMIT_INTERVAL = 0.3  # 进度回调的最小间隔（秒）
+
+    def __init__(self, worker=None, duration=None, on_progress=None, progress_range=(0, 100)):
+        self.worker = worker
+        self.duration = duration
+        if on_progress is None and worker is not None:
+            on_progress = worker.progress_updated.emit
+        self.on_progress = on_progress
+        self.progress_range = progress_range
+        self.percent = 0.0
+        self.out_time = 0.0
+        self.fps = 0.0
+        self.speed = 0.0
+        self.returncode = None
+        self.stderr_tail = deque(maxlen=self.STDERR_TAIL_LINES)
+
+    @property
+    def error_text(self):
+        """stderr 尾部，用于错误提示"""
+        return "\n".join(self.stderr_tail)
+
+    @staticmethod
+    def guess_duration(cmd):
+        """从命令行推断输出时长：优先 -t，其次探测第一个输入文件"""
+        if "-t" in cmd:
+            try:
+                return float(cmd[cmd.index("-t") + 1])
+            except (ValueError, IndexError):
+                pass
+        if "-i" in cmd:
+            idx = cmd.index("-i")
+            # concat 列表文件无法直接探测时长
+            if cmd[max(0, idx - 2):idx] != ["-f", "concat"] and idx + 1 < len(cmd):
+                return get_media_duration(cmd[idx + 1])
+        return None
+
+    def run(self, cmd):
+        """执行 ffmpeg 命令，返回退出码"""
+        cmd = list(cmd)
+        if self.duration is None:
+            self.duration = self.guess_duration(cmd)
+        full_cmd = [cmd[0], "-nostats", "-progress", "pipe:1"] + cmd[1:]
+
+        proc = subprocess.Popen(full_cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True, encoding="utf-8",
+                                errors="replace", bufsize=1)
+        if self.worker is not None:
+            self.worker.processes.add(proc)
+
+        # stderr 在独立线程中读取，只保留尾部若干行，避免长时间编码时占用大量内存
+        stderr_thread = threading.Thread(target=self._drain_stderr, args=(proc.stderr,), daemon=True)
+        stderr_thread.start()
+
+        last_emit = 0.0
+        try:
+            for line in proc.stdout:
+                key, _, value = line.strip().partition("=")
+                if key in ("out_time_us", "out_time_ms"):
+                    # out_time_ms 实际单位也是微秒
+                    if value.isdigit():
+                        self.out_time = int(value) / 1000000.0
+                elif key == "fps":
+                    self.fps = self._to_float(value)
+                elif key == "speed":
+                    self.speed = self._to_float(value.rstrip("x"))
+                elif key == "progress":
+                    now = time.time()
+                    if value == "end" or now - last_emit >= self.EMIT_INTERVAL:
+                        last_emit = now
+                        self._emit(final=(value == "end"))
+            proc.wait()
+        finally:
+            stderr_thread.join(timeout=5)
+            if self.worker is not None:
+                self.worker.processes.discard(proc)
+
+        self.returncode = proc.returncode
+        return self.returncode
+
+    def _drain_stderr(self, stream):
+        for line in stream:
+            line = line.rstrip()
+            if line:
+                self.stderr_tail.append(line)
+
+    @staticmethod
+    def _to_float(value):
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+
+    def _emit(self, final=False):
+        if self.duration:
+            self.percent = min(self.out_time / self.duration * 100, 100.0)
+        if final:
+            self.percent = 100.0
+        if self.on_progress is not None:
+            low, high = self.progress_range
+            self.on_progress(int(low + (high - low) * self.percent / 100))
+        if self.worker is not None:
+            self.worker.stats_updated.emit(self.fps, self.speed)
+
+def make_scratch_dir(prefix):
+    """在 temp 下为本次运行创建独立的临时目录，多个任务同时运行时不会互相覆盖"""
+    temp_dir = os.path.join(os.getcwd(), 'temp')
+    os.makedirs(temp_dir, exist_ok=True)
+    return tempfile.mkdtemp(prefix=prefix, dir=temp_dir)
+
+def run_ffmpeg_parallel(worker, jobs, max_workers, progress_range=(0, 100)):
+    """并行运行一组独立的 ffmpeg 编码任务，返回与 jobs 顺序一致的 [(输出路径或 None, 错误信息), ...]
+
+    jobs 为 [(build_cmd, duration, out_path, error_prefix), ...]，build_cmd(threads) 返回命令，
+    threads 为按并发数平分的 CPU 线程数。各任务进度取平均后映射到 progress_range；
+    worker 取消后未开始的任务直接跳过，运行中的 ffmpeg 由 worker.cancel() 终止。
+    """
+    count = len(jobs)
+    if not count:
+        return []
+    workers = max(1, min(count, max_workers))
+    threads = max(1, (os.cpu_count() or 4) // workers)
+    percents = [0] * count
+    lock = threading.Lock()
+    low, high = progress_range
+
+    def on_progress(index, value):
+        with lock:
+            percents[index] = value
+            total = sum(percents) / count
+        worker.progress_updated.emit(int(low + (high - low) * total / 100))
+
+    def run_job(index):
+        build_cmd, duration, out_path, error_prefix = jobs[index]
+        if worker.is_cancelled:
+            return None, "已取消"
+        runner = FFmpegRunner(worker, duration=duration, on_progress=lambda v: on_progress(index, v))
+        if runner.run(build_cmd(threads)) != 0 or not os.path.isfile(out_path):
+            return None, f"{error_prefix}{runner.error_text}"
+        return out_path, ""
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_job, range(count)))
+
+WHISPER_MODEL_NAME = "ggml-large-v3-turbo-q5_0.bin"
+
+def get_whisper_paths():
+    """返回 (whisper.cpp 可执行文件目录, 模型路径)，环境不完整时抛 RuntimeError"""
+    aipath = os.environ.get("AIPATH")
+    if not aipath:
+        raise RuntimeError("未检测到AIPATH AI目录变量")
+    bin_dir = os.path.join(aipath, "whisper.cpp/build/bin")
+    model_path = os.path.join(aipath, "whisper.cpp/models", WHISPER_MODEL_NAME)
+    if not os.path.exists(model_path):
+        raise RuntimeError(f"找不到whisper模型: {model_path}")
+    return bin_dir, model_path
+
+AUDIO_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+def prepare_whisper_audio(audio_path, worker=None, progress_range=(0, 100)):
+    """转为 whisper 原生输入格式（16kHz 单声道 s16 WAV），按源文件内容哈希缓存
+
+    返回缓存文件路径；转换失败时抛 RuntimeError。
+    """
+    cache_dir = get_cache_dir("audio")
+    cached = os.path.join(cache_dir, f"{file_content_hash(audio_path)}.wav")
+    if os.path.exists(cached):
+        os.utime(cached)  # 续期，避免被 LRU 淘汰
+        return cached
+
+    # 先写临时文件再原子替换，中途取消或失败不会留下残缺的缓存
+    with atomic_write_path(cached) as tmp_path:
+        runner = FFmpegRunner(worker, progress_range=progress_range)
+        runner.run(["ffmpeg", "-y", "-i", audio_path, "-vn", "-ar", "16000", "-ac", "1",
+                    "-c:a", "pcm_s16le", "-f", "wav", tmp_path])
+        if runner.returncode != 0:
+            raise RuntimeError(f"音频转换失败: {runner.error_text}")
+    evict_directory_lru(cache_dir, AUDIO_CACHE_MAX_BYTES)
+    return cached
+
+def run_in_whisper_env(cmd, **kwargs):
+    """在 modelscope conda 环境中执行 whisper.cpp 命令（exec 替换 shell，便于直接终止进程）"""
+    shell_cmd = f"source ~/.zshrc && conda activate modelscope && exec {' '.join(cmd)}"
+    print(f"Executing: {shell_cmd}")
+    return subprocess.Popen(shell_cmd, shell=True, executable="/bin/zsh", **kwargs)
+
+SILENCE_RE = re.compile(r"silence_(start|end): (-?\d+(?:\.\d+)?)")
+
+def detect_silences(path, noise_db=-35, min_silence=0.4):
+    """用 ffmpeg silencedetect 找出静音区间，返回 [(start, end), ...]（秒）"""
+    cmd = ["ffmpeg", "-hide_banner", "-nostats", "-i", path,
+           "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}", "-f", "null", "-"]
+    result = subprocess.run(cmd, capture_output=True, text=True, errors="ignore")
+    silences, start = [], None
+    for kind, value in SILENCE_RE.findall(result.stderr):
+        if kind == "start":
+            start = max(0.0, float(value))
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    return silences
+
+def choose_split_points(duration, silences, chunks, search_window=0.25):
+    """在均分点附近挑选最近的静音中点作为切分点，找不到时退回均分点
+
+    search_window 是相对单段时长的搜索半径；返回递增的切分时间列表（秒）。
+    """
+    if chunks <= 1 or duration <= 0:
+        return []
+    step = duration / chunks
+    mids = [(s + e) / 2 for s, e in silences]
+    points, last = [], 0.0
+    for i in range(1, chunks):
+        target = step * i
+        near = [m for m in mids if abs(m - target) <= step * search_window and m > last + 1]
+        point = min(near, key=lambda m: abs(m - target)) if near else target
+        if point > last + 1 and point < duration - 1:
+            points.append(point)
+            last = point
+    return points
+
+class WhisperServer:
+    """常驻 whisper.cpp server：模型只加载一次，转写请求进入队列按顺序送入服务
+
+    每个服务占用 threads 个推理线程；批量多槽位时由 WhisperServerPool 为每个槽位各起一个服务。
+    """
+    STARTUP_TIMEOUT = 180  # 秒，包含 conda 激活和模型加载
+    REQUEST_TIMEOUT = 3600
+
+    def __init__(self, threads=None):
+        self.threads = threads or os.cpu_count() or 4
+        self.process = None
+        self.port = None
+        self.requests = queue.Queue()
+        self.dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.dispatcher.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def submit(self, wav_path, language="zh", max_len=0, response_format="srt"):
+        """提交转写请求，返回 Future；结果为服务返回的文本（srt/json 等）"""
+        future = Future()
+        self.requests.put((future, wav_path, {
+            "language": language,
+            "max_len": str(max_len),
+            "response_format": response_format,
+            "temperature": "0.0",
+        }))
+        return future
+
+    def pending_count(self):
+        return self.requests.qsize()
+
+    def _dispatch_loop(self):
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return  # close() 后退出
+            future, wav_path, fields = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                self._ensure_started()
+                with open(wav_path, "rb") as f:
+                    resp = requests.post(f"{self.url}/inference", files={"file": f},
+                                         data=fields, timeout=self.REQUEST_TIMEOUT)
+                resp.raise_for_status()
+                # 响应不带 charset，按 UTF-8 解码而不是让 requests 猜测编码
+                future.set_result(resp.content.decode("utf-8", errors="replace"))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _ensure_started(self):
+        if self.is_running():
+            return
+        bin_dir, model_path = get_whisper_paths()
+        server_bin = os.path.join(bin_dir, "whisper-server")
+        if not os.path.exists(server_bin):
+            raise RuntimeError(f"找不到whisper服务程序: {server_bin}")
+
+        with closing(socket.socket()) as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        cmd = [server_bin, "-m", model_path, "-t", str(self.threads),
+               "--host", "127.0.0.1", "--port", str(self.port)]
+        proc = run_in_whisper_env(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                  text=True, errors="ignore")
+        self.process = proc
+        # 持续排空 stderr（模型加载日志很多，管道写满会卡住服务），只保留尾部用于报错
+        stderr_tail = deque(maxlen=20)
+        drain = threading.Thread(target=lambda: stderr_tail.extend(proc.stderr), daemon=True)
+        drain.start()
+
+        deadline = time.time() + self.STARTUP_TIMEOUT
+        while time.time() < deadline:
+            if proc.poll() is not None:
+                drain.join(timeout=1)
+                self.process = None
+                raise RuntimeError(f"whisper服务启动失败: {''.join(stderr_tail)[-300:]}")
+            try:
+                requests.get(self.url, timeout=1)
+                return
+            except requests.RequestException:
+                time.sleep(0.5)
+        self.stop()
+        raise RuntimeError("whisper服务启动超时")
+
+    def stop(self):
+        if self.is_running():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def close(self):
+        """停止服务进程并结束分发线程，之后不再接受请求"""
+        self.stop()
+        self.requests.put(None)
+
+class WhisperServerPool:
+    """常驻 whisper 服务池：每个转写任务独占一个空闲服务，服务用完放回池中复用
+
+    并发的任务数由调用方（批量任务池的槽位数）限制，池中服务数量随之增长，
+    每个服务只在首次使用时加载模型。线程数与请求不同的空闲服务（槽位数调整后留下的）
+    在需要新建服务时关闭，释放其占用的内存。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle = []
+
+    def acquire(self, threads):
+        """取一个 threads 线程的空闲服务，没有时新建（首次转写时才启动）"""
+        stale = []
+        with self.lock:
+            for server in self.idle:
+                if server.threads == threads:
+                    self.idle.remove(server)
+                    return server
+            stale, self.idle = self.idle, []
+        for server in stale:
+            server.close()
+        return WhisperServer(threads)
+
+    def release(self, server):
+        with self.lock:
+            self.idle.append(server)
+
+    def close_all(self):
+        with self.lock:
+            servers, self.idle = self.idle, []
+        for server in servers:
+            server.close()
+
+TRANSCRIPT_CACHE_MAX_BYTES = 512 * 1024 ** 2
+TRANSCRIPT_CACHE_VERSION = 2  # 词级结果格式变化时递增，旧缓存自动失效
+
+def transcript_cache_path(audio_hash, model, language):
+    """词级转写缓存文件路径，键为 (音频内容哈希, 模型, 语言)"""
+    key = hashlib.sha256(f"{audio_hash}|{model}|{language}|v{TRANSCRIPT_CACHE_VERSION}".encode("utf-8")).hexdigest()
+    return os.path.join(get_cache_dir("transcripts"), f"{key}.json")
+
+def load_cached_transcript(cache_path):
+    """读取缓存的词级时间轴 [(start_ms, end_ms, text, segment_end), ...]，不存在或损坏时返回 None"""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            words = [tuple(w) for w in json.load(f)["words"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    os.utime(cache_path)
+    return words
+
+def save_cached_transcript(cache_path, words, model, language):
+    data = {"model": model, "language": language, "words": [list(w) for w in words]}
+    with atomic_write_path(cache_path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    evict_directory_lru(os.path.dirname(cache_path), TRANSCRIPT_CACHE_MAX_BYTES)
+
+def is_special_token(text):
+    """whisper 特殊 token（[_BEG_]、[_TT_123] 等）"""
+    return text.startswith("[_") and text.endswith("]")
+
+def parse_whisper_full_json_words(raw_bytes):
+    """whisper-cli -ojf 输出 → 词级时间轴 [(start_ms, end_ms, text, segment_end), ...]
+
+    whisper.cpp 按字节级 token 原样写出文本，一个汉字常被拆成多个 token，单个 token 不是
+    合法 UTF-8。这里用 surrogateescape 读取 JSON 以保留原始字节，同一分段内相邻 token 的
+    字节拼接到能完整解码为止再作为一个词；分段边界保留在 segment_end 中。
+    """
+    words = []
+    for segment in json.loads(raw_bytes.decode("utf-8", errors="surrogateescape")).get("transcription", []):
+        items = []
+        pending, pending_start = b"", None
+        for token in segment.get("tokens", []):
+            text = token.get("text", "")
+            if is_special_token(text):
+                continue
+            if not pending:
+                pending_start = int(token["offsets"]["from"])
+            pending += text.encode("utf-8", errors="surrogateescape")
+            try:
+                decoded = pending.decode("utf-8")
+            except UnicodeDecodeError:
+                continue  # 字符尚未完整，继续拼接下一个 token
+            items.append((pending_start, int(token["offsets"]["to"]), decoded))
+            pending = b""
+        if pending:
+            # 分段末尾仍不完整时显式替换为 U+FFFD，不静默丢弃
+            items.append((pending_start, int(segment["offsets"]["to"]),
+                                   pending.decode("utf-8", errors="replace")))
+        items = [w for w in items if w[2].strip()]
+        words.extend((start, end, text, i == len(items) - 1)
+                     for i, (start, end, text) in enumerate(items))
+    return words
+
+def align_tokens_to_text(text, tokens):
+    """把 token 级时间对齐到分段文本，返回 [(start_ms, end_ms, 片段)]，对齐失败返回 None
+
+    whisper-server 输出 JSON 时会把不完整的 UTF-8 字节替换为 U+FFFD，这些 token 无法直接
+    使用；连续的这类 token 合为一组，对应分段文本中前后两个可识别 token 之间的字符。
+    结果只切分分段文本本身，文本内容不会丢失。
+    """
+    words, pending = [], []
+    pos = 0
+    for start, end, token_text in tokens:
+        if "\ufffd" in token_text:
+            pending.append((start, end))
+            continue
+        idx = text.find(token_text, pos)
+        if idx < 0:
+            return None
+        if pending:
+            if idx > pos:
+                words.append((pending[0][0], pending[-1][1], text[pos:idx]))
+                pos = idx
+            pending = []
+        words.append((start, end, text[pos:idx + len(token_text)]))
+        pos = idx + len(token_text)
+    if pending and pos < len(text):
+        words.append((pending[0][0], pending[-1][1], text[pos:]))
+    elif pos < len(text) and words:
+        start, end, last = words[-1]
+        words[-1] = (start, end, last + text[pos:])
+    return words or None
+
+def parse_whisper_verbose_words(json_text):
+    """whisper-server verbose_json 输出 → 词级时间轴 [(start_ms, end_ms, text, segment_end), ...]"""
+    words = []
+    for seg in json.loads(json_text).get("segments", []):
+        seg_text = seg.get("text", "")
+        if not seg_text.strip():
+            continue
+        tokens = [(int(round(w["start"] * 1000)), int(round(w["end"] * 1000)), w["word"])
+                  for w in seg.get("words", []) if not is_special_token(w.get("word", ""))]
+        aligned = align_tokens_to_text(seg_text, tokens) if tokens else None
+        if aligned is None:
+            # 没有 token 时间或无法对齐时退回整段
+            aligned = [(int(round(seg["start"] * 1000)), int(round(seg["end"] * 1000)), seg_text)]
+        aligned = [w for w in aligned if w[2].strip()]
+        words.extend((start, end, text, i == len(aligned) - 1) for i, (start, end, text) in enumerate(aligned))
+    return words
+
+SENTENCE_END = "。！？!?.…"
+
+def segment_words(words, max_len, max_gap_ms=1000):
+    """按每行字符数把词级时间轴重新组合为字幕条目 [(start_ms, end_ms, text), ...]
+
+    超出字符数、词间停顿超过 max_gap_ms 或上一句已结束时换条，whisper 分段结束处总是换条；
+    不在标点前或英文单词中间（无前导空格的子词）断开。
+    """
+    cues, current = [], []
+
+    def flush():
+        if current:
+            cues.append((current[0][0], current[-1][1], "".join(w[2] for w in current).strip()))
+            current.clear()
+
+    for start, end, text, segment_end in words:
+        if current:
+            head = text.strip()[:1] or " "
+            breakable = ((text.startswith(" ") or not head.isascii())
+                         and not unicodedata.category(head).startswith("P"))
+            current_text = "".join(w[2] for w in current).strip()
+            if breakable and (len(current_text) + len(text.strip()) > max_len
+                              or start - current[-1][1] > max_gap_ms
+                              or current_text[-1:] in SENTENCE_END):
+                flush()
+        current.append((start, end, text))
+        if segment_end:
+            flush()
+    flush()
+    return cues
+
+_whisper_server_pool = None
+_whisper_server_pool_lock = threading.Lock()
+
+def get_whisper_server_pool():
+    """全局共享的 whisper 服务池（服务在首次转写时才启动并加载模型，程序退出时全部关闭）"""
+    global _whisper_server_pool
+    with _whisper_server_pool_lock:
+        if _whisper_server_pool is None:
+            _whisper_server_pool = WhisperServerPool()
+            atexit.register(_whisper_server_pool.close_all)
+        return _whisper_server_pool
+
 # 工作线程类
 class WorkerThread(QThread):
     """工作线程基类"""
     progress_updated = pyqtSignal(int)
     log_updated = pyqtSignal(str)
+    stats_updated = pyqtSignal(float, float)  # ffmpeg 实时 (fps, speed)
     finished = pyqtSignal(bool, str)
 
     def __init__(self):
         super().__init__()
         self.is_cancelled = False
+        self.processes = set()  # 当前线程启动的子进程，取消时统一终止
+
+    def cancel(self):
+        """取消任务并终止正在运行的子进程"""
+        self.is_cancelled = True
+        for proc in list(self.processes):
+            if proc.poll() is None:
+                proc.kill()
+
+class FFmpegJobPool(QObject):
+    """有界 ffmpeg 任务池：FIFO 排队，同时运行的任务数不超过 max_workers"""
+    job_started = pyqtSignal(str)  # job_id
+    job_finished = pyqtSignal(str, bool, str)  # (job_id, success, message)
+    batch_progress_updated = pyqtSignal(int, int, float)  # (completed, total, eta 秒，未知时为 -1)
+    progress_updated = pyqtSignal(int)  # 总体进度百分比
+    all_jobs_finished = pyqtSignal()
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.max_workers = max(1, max_workers or os.cpu_count() or 4)
+        self.pending = deque()  # (job_id, worker)
+        self.running = {}  # job_id -> worker
+        self.job_progress = {}  # job_id -> 0~100
+        self.completed = 0
+        self.total = 0
+        self.start_time = None
+
+    def set_max_workers(self, max_workers):
+        """调整并发数，扩容时立即启动排队中的任务"""
+        self.max_workers = max(1, int(max_workers))
+        self._start_next()
+
+    def submit(self, job_id, worker):
+        """提交任务（WorkerThread），按提交顺序排队执行"""
+        if self.total == 0:
+            self.start_time = time.time()
+        self.total += 1
+        self.pending.append((job_id, worker))
+        self._start_next()
+        self._emit_progress()
+
+    def is_busy(self):
+        return bool(self.pending or self.running)
+
+    def cancel_job(self, job_id):
+        """取消单个任务：排队中的直接移除，运行中的终止其 ffmpeg 进程"""
+        for item in list(self.pending):
+            if item[0] == job_id:
+                self.pending.remove(item)
+                self._finish_job(job_id, False, "已取消")
+                return True
+        worker = self.running.get(job_id)
+        if worker is not None:
+            worker.cancel()
+            return True
+        return False
+
+    def cancel_all(self):
+        """取消所有排队和运行中的任务"""
+        while self.pending:
+            job_id, _ = self.pending.popleft()
+            self._finish_job(job_id, False, "已取消")
+        for worker in list(self.running.values()):
+            worker.cancel()
+
+    def _start_next(self):
+        while self.pending and len(self.running) < self.max_workers:
+            job_id, worker = self.pending.popleft()
+            self.running[job_id] = worker
+            self.job_progress[job_id] = 0
+            worker.progress_updated.connect(lambda v, jid=job_id: self._on_job_progress(jid, v))
+            worker.finished.connect(lambda ok, msg, jid=job_id: self._on_job_finished(jid, ok, msg))
+            worker.start()
+            self.job_started.emit(job_id)
+
+    def _on_job_progress(self, job_id, value):
+        if job_id in self.running:
+            self.job_progress[job_id] = value
+            self._emit_progress()
+
+    def _on_job_finished(self, job_id, success, message):
+        worker = self.running.pop(job_id, None)
+        if worker is None:
+            return
+        if worker.is_cancelled and not success:
+            message = "已取消"
+        self._finish_job(job_id, success, message)
+        self._start_next()
+
+    def _finish_job(self, job_id, success, message):
+        self.job_progress.pop(job_id, None)
+        self.completed += 1
+        self.job_finished.emit(job_id, success, message)
+        self._emit_progress()
+        if not self.pending and not self.running:
+            self.all_jobs_finished.emit()
+            self.completed = 0
+            self.total = 0
+            self.start_time = None
+
+    def _emit_progress(self):
+        if self.total <= 0:
+            return
+        # 已完成任务按 100% 计，运行中任务按各自进度折算
+        done = self.completed + sum(self.job_progress.values()) / 100.0
+        fraction = min(done / self.total, 1.0)
+        eta = -1.0
+        if fraction > 0 and self.start_time is not None:
+            elapsed = time.time() - self.start_time
+            eta = elapsed * (1 - fraction) / fraction
+        self.progress_updated.emit(int(fraction * 100))
+        self.batch_progress_updated.emit(self.completed, self.total, eta)
+
+class FolderProbeThread(WorkerThread):
+    """在后台并行探测文件夹中的媒体文件，结果存入 self.probed（{路径: 信息}），探测缓存供后续任务复用"""
+
+    def __init__(self, folder, extensions=None):
+        super().__init__()
+        self.folder = folder
+        self.extensions = extensions
+        self.probed = {}
+
+    def run(self):
+        try:
+            self.probed = probe_folder(self.folder, self.extensions)
+            self.finished.emit(True, self.folder)
+        except Exception as e:
+            self.finished.emit(False, f"读取文件夹失败: {str(e)}")
 
 class VideoConversionThread(WorkerThread):
     """视频转换线程"""
@@ -63,65 +999,528 @@ class VideoConversionThread(WorkerThread):
 
             self.log_updated.emit(f"开始处理: {os.path.basename(self.video_path)}")
 
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0 and os.path.exists(self.output_path):
+            runner = FFmpegRunner(self)
+            runner.run(cmd)
+
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+            elif runner.returncode == 0 and os.path.exists(self.output_path):
                 self.progress_updated.emit(100)
                 self.log_updated.emit(f"完成: {os.path.basename(self.output_path)}")
                 self.finished.emit(True, self.output_path)
             else:
-                self.finished.emit(False, f"处理失败: {result.stderr}")
+                self.finished.emit(False, f"处理失败: {runner.error_text}")
         except Exception as e:
             self.finished.emit(False, f"处理异常: {str(e)}")
 
+class VideoResizeThread(WorkerThread):
+    """视频分辨率转换线程"""
+
+    def __init__(self, video_path, output_path, scale_filter):
+        super().__init__()
+        self.video_path = video_path
+        self.output_path = output_path
+        self.scale_filter = scale_filter
+
+    def run(self):
+        try:
+            cmd = [
+                "ffmpeg", "-y", "-i", self.video_path,
+                "-vf", self.scale_filter,
+                "-c:v", "libx264", "-preset", "fast", "-crf", "18",
+                "-c:a", "copy",
+                self.output_path
+            ]
+            runner = FFmpegRunner(self)
+            runner.run(cmd)
+
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+            elif os.path.exists(self.output_path) and os.path.getsize(self.output_path) > 1024:
+                self.progress_updated.emit(100)
+                self.finished.emit(True, self.output_path)
+            else:
+                self.finished.emit(False, runner.error_text)
+        except Exception as e:
+            self.finished.emit(False, f"分辨率转换异常: {str(e)}")
+
+class VideoSplitThread(WorkerThread):
+    """视频分割线程"""
+
+    def __init__(self, video_path, seg_dir, segment_name, count, mode="fast", max_workers=None):
+        super().__init__()
+        self.video_path = video_path
+        self.seg_dir = seg_dir
+        self.segment_name = segment_name
+        self.count = count
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self.segments = []  # 实际生成的片段，快速分割按关键帧切开时可能少于 count
+
+    def run(self):
+        try:
+            duration = get_media_duration(self.video_path)
+            if not duration:
+                self.finished.emit(False, "无法获取视频时长")
+                return
+
+            seg_len = duration / self.count
+            self.log_updated.emit(f"视频总时长: {duration:.2f}秒, 每段: {seg_len:.2f}秒")
+
+            if self.mode == "fast":
+                ok, message = self.split_fast(duration, seg_len)
+            else:
+                ok, message = self.split_exact(seg_len)
+
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+            elif ok:
+                self.segments = self.collect_segments()
+                if len(self.segments) != self.count:
+                    self.log_updated.emit(f"请求 {self.count} 段，实际生成 {len(self.segments)} 段（分割点附近缺少关键帧）")
+                self.progress_updated.emit(100)
+                self.finished.emit(True, self.seg_dir)
+            else:
+                self.finished.emit(False, message)
+        except Exception as e:
+            self.finished.emit(False, f"视频分割异常: {str(e)}")
+
+    def collect_segments(self):
+        """按序号列出 seg_dir 中生成的片段文件"""
+        pattern = re.compile(rf"{re.escape(self.segment_name)}_(\d+)\.mp4$")
+        found = []
+        for name in os.listdir(self.seg_dir):
+            m = pattern.match(name)
+            if m:
+                found.append((int(m.group(1)), os.path.join(self.seg_dir, name)))
+        return [path for _, path in sorted(found)]
+
+    def split_fast(self, duration, seg_len):
+        """快速分割：segment 封装器流复制，一次读取，在分割点之后的关键帧处切开"""
+        split_points = ",".join(f"{seg_len * i:.3f}" for i in range(1, self.count))
+        out_pattern = os.path.join(self.seg_dir, f"{self.segment_name}_%d.mp4")
+        cmd = [
+            "ffmpeg", "-y", "-i", self.video_path,
+            "-map", "0:v:0", "-map", "0:a?", "-c", "copy",
+            "-f", "segment", "-segment_times", split_points,
+            "-segment_start_number", "1", "-reset_timestamps", "1",
+            out_pattern
+        ]
+        runner = FFmpegRunner(self, duration=duration)
+        if runner.run(cmd) != 0:
+            return False, f"快速分割失败: {runner.error_text}"
+        return True, ""
+
+    def split_exact(self, seg_len):
+        """精确分割：输入端定位（-ss 在 -i 之前）重新编码，各片段并行处理"""
+        def segment_job(index):
+            out_path = os.path.join(self.seg_dir, f"{self.segment_name}_{index+1}.mp4")
+            build_cmd = lambda threads: [
+                "ffmpeg", "-y", "-ss", f"{index * seg_len:.3f}", "-i", self.video_path,
+                "-t", f"{seg_len:.3f}",
+                "-c:v", "libx264", "-threads", str(threads), "-c:a", "copy", out_path
+            ]
+            return build_cmd, seg_len, out_path, f"片段 {index+1} 分割失败: "
+
+        results = run_ffmpeg_parallel(self, [segment_job(i) for i in range(self.count)], self.max_workers)
+        for out_path, message in results:
+            if out_path is None:
+                return False, message
+        return True, ""
+
+class VideoMergeThread(WorkerThread):
+    """基础合并线程：片段参数一致时流复制拼接，否则统一规格后只重新编码一次；音频与封面同一次封装"""
+
+    def __init__(self, video_paths, audio_path, output_path, cover_path=None):
+        super().__init__()
+        self.video_paths = video_paths
+        self.audio_path = audio_path
+        self.output_path = output_path
+        self.cover_path = cover_path
+
+    def run(self):
+        try:
+            temp_dir = os.path.join(os.getcwd(), 'temp')
+            os.makedirs(temp_dir, exist_ok=True)
+            ts = datetime.now().strftime("%Y%m%d%H%M%S")
+
+            # 先探测所有片段的视频流参数，判断能否直接流复制拼接
+            streams = probe_paths(self.video_paths)
+            for path, st in zip(self.video_paths, streams):
+                if st is None or not st["width"]:
+                    self.finished.emit(False, f"无法读取视频信息: {os.path.basename(path)}")
+                    return
+
+            def signature(st):
+                return (st["video_codec"], st["width"], st["height"], st["time_base"], st["pix_fmt"])
+
+            homogeneous = all(signature(st) == signature(streams[0]) for st in streams)
+            video_duration = sum(st["duration"] or 0 for st in streams)
+            audio_duration = get_media_duration(self.audio_path)
+            known = [d for d in (video_duration, audio_duration) if d]
+            out_duration = min(known) if known else None
+            self.progress_updated.emit(10)
+
+            # 封面（如果有），PNG 先转 JPG
+            cover_file_to_use = None
+            if self.cover_path and os.path.isfile(self.cover_path):
+                cover_file_to_use = self.cover_path
+                if os.path.splitext(self.cover_path)[1].lower() == ".png":
+                    cover_jpg = os.path.join(temp_dir, f"cover_{ts}.jpg")
+                    try:
+                        Image.open(self.cover_path).convert('RGB').save(cover_jpg, quality=95)
+                        cover_file_to_use = cover_jpg
+                    except Exception:
+                        pass
+
+            if homogeneous:
+                # 参数一致：concat 分离器流复制拼接
+                filelist_path = os.path.join(temp_dir, f"filelist-{ts}.txt")
+                write_concat_list(filelist_path, self.video_paths)
+                inputs = ["-f", "concat", "-safe", "0", "-i", filelist_path]
+                filter_args = []
+                video_map = "0:v:0"
+                video_codec = ["-c:v", "copy"]
+                next_input = 1
+            else:
+                # 参数不一致：统一缩放到首个片段的规格，只重新编码一次
+                first = streams[0]
+                width, height = first["width"], first["height"]
+                inputs = []
+                chains = []
+                for i, vp in enumerate(self.video_paths):
+                    inputs += ["-i", vp]
+                    chains.append(
+                        f"[{i}:v:0]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={first['fps']},format=yuv420p[v{i}]"
+                    )
+                concat_inputs = "".join(f"[v{i}]" for i in range(len(self.video_paths)))
+                filter_args = ["-filter_complex",
+                               ";".join(chains) + f";{concat_inputs}concat=n={len(self.video_paths)}:v=1:a=0[vout]"]
+                video_map = "[vout]"
+                video_codec = ["-c:v:0", "libx264", "-preset", "fast", "-crf", "18"]
+                next_input = len(self.video_paths)
+                self.log_updated.emit("视频片段参数不一致，将统一规格后重新编码一次")
+
+            audio_input = next_input
+            inputs += ["-i", self.audio_path]
+            maps = ["-map", video_map, "-map", f"{audio_input}:a:0"]
+            cover_args = []
+            if cover_file_to_use:
+                inputs += ["-i", cover_file_to_use]
+                maps += ["-map", f"{audio_input + 1}:v:0"]
+                cover_args = ["-c:v:1", "copy", "-disposition:v:1", "attached_pic"]
+
+            cmd = (["ffmpeg", "-y"] + inputs + filter_args + maps + video_codec
+                   + ["-c:a", "aac", "-b:a", "192k"] + cover_args)
+            # 附加封面时 -shortest 不可靠，直接按较短时长截断
+            if out_duration:
+                cmd += ["-t", f"{out_duration:.3f}"]
+            else:
+                cmd += ["-shortest"]
+            cmd.append(self.output_path)
+
+            runner = FFmpegRunner(self, duration=out_duration, progress_range=(10, 100))
+            runner.run(cmd)
+
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+            elif os.path.isfile(self.output_path) and os.path.getsize(self.output_path) >= 1024:
+                self.progress_updated.emit(100)
+                self.finished.emit(True, self.output_path)
+            else:
+                self.finished.emit(False, f"合成音视频失败: {runner.error_text}")
+
+        except Exception as e:
+            self.finished.emit(False, f"合并异常: {str(e)}")
+
+class ZoomMergeThread(WorkerThread):
+    """缩放合并线程：并行为各片段应用滤镜，按原顺序拼接并合成音频"""
+
+    def __init__(self, video_paths, audio_path, output_path, zoom_end, filter_type,
+                 preset="均衡", max_workers=None):
+        super().__init__()
+        self.video_paths = video_paths
+        self.audio_path = audio_path
+        self.output_path = output_path
+        self.zoom_end = zoom_end
+        self.filter_type = filter_type
+        self.preset = preset
+        cores = os.cpu_count() or 4
+        self.max_workers = max_workers or max(1, cores // 2)
+
+    def run(self):
+        scratch_dir = make_scratch_dir("zoom-")
+        try:
+            streams = probe_paths(self.video_paths)
+            for path, st in zip(self.video_paths, streams):
+                if st is None or not st["duration"] or not st["width"]:
+                    self.finished.emit(False, f"无法获取视频时长: {path}")
+                    return
+
+            # 所有片段统一为首个片段的规格，保证最终拼接可以流复制
+            first = streams[0]
+            width, height = first["width"] // 2 * 2, first["height"] // 2 * 2
+            fps = first["fps"]
+            count = len(self.video_paths)
+
+            def filter_job(index):
+                in_path = self.video_paths[index]
+                duration = streams[index]["duration"]
+                out_path = os.path.join(scratch_dir, f"filtered_{index+1:04d}.mp4")
+                vf_str = build_zoom_filter(self.filter_type, self.zoom_end, duration, fps,
+                                           width, height, self.preset)
+                build_cmd = lambda threads: [
+                    "ffmpeg", "-y", "-i", in_path, "-vf", vf_str, "-an",
+                    "-c:v", "libx264", "-preset", "fast", "-crf", "18",
+                    "-threads", str(threads), out_path
+                ]
+                return build_cmd, duration, out_path, f"滤镜处理失败: {os.path.basename(in_path)}\n"
+
+            self.log_updated.emit(f"并行处理 {count} 个片段（{min(count, self.max_workers)} 路并发）...")
+            results = run_ffmpeg_parallel(self, [filter_job(i) for i in range(count)], self.max_workers,
+                                          progress_range=(0, 90))
+
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+                return
+            for out_path, message in results:
+                if out_path is None:
+                    self.finished.emit(False, message)
+                    return
+
+            # 按原始顺序拼接（流复制），并在同一次调用中合成音频
+            filelist_path = os.path.join(scratch_dir, "filelist.txt")
+            write_concat_list(filelist_path, [out_path for out_path, _ in results])
+            video_duration = sum(st["duration"] for st in streams)
+            audio_duration = get_media_duration(self.audio_path)
+            out_duration = min(video_duration, audio_duration) if audio_duration else video_duration
+            cmd = [
+                "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", filelist_path, "-i", self.audio_path,
+                "-map", "0:v:0", "-map", "1:a:0",
+                "-c:v", "copy", "-c:a", "aac", "-b:a", "192k",
+                "-t", f"{out_duration:.3f}", self.output_path
+            ]
+            runner = FFmpegRunner(self, duration=out_duration, progress_range=(90, 100))
+            runner.run(cmd)
+
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+            elif runner.returncode == 0 and os.path.isfile(self.output_path):
+                self.progress_updated.emit(100)
+                self.finished.emit(True, self.output_path)
+            else:
+                self.finished.emit(False, f"合成音视频失败: {runner.error_text}")
+        except Exception as e:
+            self.finished.emit(False, f"缩放合并异常: {str(e)}")
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+class SubtitleBurnThread(WorkerThread):
+    """字幕烧录线程：chunks > 1 时在关键帧处分段，各段并行烧录后无损拼接"""
+
+    def __init__(self, video_path, srt_path, output_path, force_style, chunks=1, max_workers=None):
+        super().__init__()
+        self.video_path = video_path
+        self.srt_path = srt_path
+        self.output_path = output_path
+        self.force_style = force_style
+        self.chunks = chunks
+        self.max_workers = max_workers or chunks
+
+    def subtitle_filter(self, srt_path):
+        return f"subtitles='{srt_path}':force_style='{self.force_style}'"
+
+    def run(self):
+        try:
+            if self.chunks <= 1:
+                cmd = [
+                    "ffmpeg", "-y", "-i", self.video_path, "-vf", self.subtitle_filter(self.srt_path),
+                    "-c:a", "copy", self.output_path
+                ]
+                runner = FFmpegRunner(self)
+                runner.run(cmd)
+                self.emit_result(runner)
+            else:
+                self.run_chunked()
+        except Exception as e:
+            self.finished.emit(False, f"整合异常: {str(e)}")
+
+    def emit_result(self, runner):
+        if self.is_cancelled:
+            self.finished.emit(False, "已取消")
+        elif os.path.exists(self.output_path) and os.path.getsize(self.output_path) > 1024:
+            self.progress_updated.emit(100)
+            self.finished.emit(True, self.output_path)
+        else:
+            self.finished.emit(False, f"整合失败: {runner.error_text}")
+
+    def run_chunked(self):
+        scratch_dir = make_scratch_dir("subburn-")
+        try:
+            info = probe(self.video_path, keyframes=True)
+            duration = info["duration"] if info else None
+            if not duration:
+                self.finished.emit(False, "无法获取视频时长")
+                return
+
+            # 1. 流复制分段：分割点对齐到最近的关键帧（索引随探测结果缓存），各段时长更均匀；
+            #    segment 封装器在分割点处切开，并记录每段实际起止时间
+            # 略早于关键帧，避免三位小数舍入后越过该关键帧切到下一个
+            split_points = ",".join(f"{p - 0.001:.3f}" for p in snap_to_keyframes(
+                [duration * i / self.chunks for i in range(1, self.chunks)], info.get("keyframes") or []))
+            list_path = os.path.join(scratch_dir, "chunks.csv")
+            cmd = [
+                "ffmpeg", "-y", "-i", self.video_path,
+                "-map", "0:v:0", "-map", "0:a?", "-c", "copy",
+                "-f", "segment", "-segment_times", split_points,
+                "-segment_list", list_path, "-segment_list_type", "csv",
+                "-reset_timestamps", "1",
+                os.path.join(scratch_dir, "chunk_%04d.mp4")
+            ]
+            runner = FFmpegRunner(self, duration=duration, progress_range=(0, 10))
+            if runner.run(cmd) != 0:
+                self.finished.emit(False, f"视频分段失败: {runner.error_text}")
+                return
+            with open(list_path, newline='', encoding='utf-8') as f:
+                chunks = [(os.path.join(scratch_dir, row[0]), float(row[1]), float(row[2]))
+                          for row in csv.reader(f) if len(row) >= 3]
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+                return
+
+            # 2. 为每段切出对应的字幕并平移时间轴
+            track = SubtitleTrack.from_file(self.srt_path)
+
+            def burn_job(index, chunk_path, start, end):
+                sliced = track.slice(int(start * 1000), int(end * 1000))
+                chunk_srt = None
+                if len(sliced):
+                    chunk_srt = sliced.write(os.path.join(scratch_dir, f"chunk_{index:04d}.srt"))
+                out_path = os.path.join(scratch_dir, f"burned_{index:04d}.mp4")
+                vf = self.subtitle_filter(chunk_srt) if chunk_srt else "null"
+                build_cmd = lambda threads: [
+                    "ffmpeg", "-y", "-i", chunk_path, "-vf", vf,
+                    "-c:v", "libx264", "-threads", str(threads), "-c:a", "copy", out_path
+                ]
+                return build_cmd, end - start, out_path, f"分段 {index+1} 烧录失败: "
+
+            jobs = [burn_job(index, *chunk) for index, chunk in enumerate(chunks)]
+
+            # 3. 并行烧录，所有分段使用相同编码参数以便无损拼接
+            count = len(jobs)
+            self.log_updated.emit(f"已分为 {count} 段，{min(count, self.max_workers)} 路并行烧录字幕...")
+            results = run_ffmpeg_parallel(self, jobs, self.max_workers, progress_range=(10, 95))
+
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+                return
+            for out_path, message in results:
+                if out_path is None:
+                    self.finished.emit(False, message)
+                    return
+
+            # 4. 按顺序无损拼接
+            filelist_path = os.path.join(scratch_dir, "filelist.txt")
+            write_concat_list(filelist_path, [out_path for out_path, _ in results])
+            cmd = [
+                "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", filelist_path,
+                "-c", "copy", self.output_path
+            ]
+            runner = FFmpegRunner(self, duration=duration, progress_range=(95, 100))
+            runner.run(cmd)
+            self.emit_result(runner)
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
 class ImageToVideoThread(WorkerThread):
     """图片转视频线程"""
 
-    def __init__(self, image_path, output_path, size, duration):
+    BG_DOWNSCALE = 4  # 背景先缩小再模糊，模糊半径按比例缩小
+    BG_BLUR_RADIUS = 3
+
+    def __init__(self, image_path, output_path, size, duration, still_fast=True):
         super().__init__()
         self.image_path = image_path
         self.output_path = output_path
         self.size = size
         self.duration = duration
+        self.still_fast = still_fast
+
+    def build_composite_filter(self, width, height):
+        """单个滤镜图：拆分输入，缩小后模糊一次作为背景，再叠加等比缩放的前景"""
+        bg_w = max(2, width // self.BG_DOWNSCALE)
+        bg_h = max(2, height // self.BG_DOWNSCALE)
+        return (
+            f"[0:v]split=2[fgsrc][bgsrc];"
+            f"[bgsrc]crop=iw/2:ih/2,scale={bg_w}:{bg_h},boxblur={self.BG_BLUR_RADIUS}:1,"
+            f"scale={width}:{height},setsar=1[bg];"
+            f"[fgsrc]scale={width}:{height}:force_original_aspect_ratio=decrease,setsar=1[fg];"
+            f"[bg][fg]overlay=(W-w)/2:(H-h)/2"
+        )
 
     def run(self):
         try:
-            width, height = self.size.split('x')
+            width, height = (int(v) for v in self.size.split('x'))
             fps = 30
-            img_name = os.path.splitext(os.path.basename(self.image_path))[0]
-            temp_dir = os.path.join(os.getcwd(), 'temp')
-            bg_img = os.path.join(temp_dir, f"{img_name}-bg.jpg")
+            fade = f"fade=t=in:st=0:d=1,fade=t=out:st={self.duration-1}:d=1"
+            composite = self.build_composite_filter(width, height)
 
             self.progress_updated.emit(10)
 
-            # 生成模糊背景
-            cmd_bg = [
-                "ffmpeg", "-y", "-loop", "1", "-framerate", str(fps), "-t", str(self.duration),
-                "-i", self.image_path,
-                "-vf", f"scale=2*{width}:2*{height},boxblur=20:1,crop={width}:{height}",
-                "-q:v", "3", bg_img
-            ]
-            subprocess.run(cmd_bg)
-
-            self.progress_updated.emit(50)
+            if self.still_fast:
+                # 静态图快速模式：只合成一帧，再以 stillimage 调优编码
+                img_name = os.path.splitext(os.path.basename(self.image_path))[0]
+                temp_dir = os.path.join(os.getcwd(), 'temp')
+                os.makedirs(temp_dir, exist_ok=True)
+                # 每个任务独立的临时帧，避免同名图片的并发任务互相覆盖
+                fd, frame_path = tempfile.mkstemp(prefix=f"{img_name}-frame-", suffix=".png", dir=temp_dir)
+                os.close(fd)
+                try:
+                    cmd_frame = [
+                        "ffmpeg", "-y", "-i", self.image_path,
+                        "-filter_complex", composite,
+                        "-frames:v", "1", frame_path
+                    ]
+                    runner = FFmpegRunner(self, duration=0, progress_range=(10, 20))
+                    if runner.run(cmd_frame) != 0:
+                        self.finished.emit(False, f"合成画面失败: {runner.error_text}")
+                        return
 
-            # 合成前景+背景
-            filter_complex = (
-                f"[0:v]scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=rgba[fg];"
-                f"[1:v]scale={width}:{height}[bg];"
-                f"[bg][fg]overlay=(W-w)/2:(H-h)/2,fade=t=in:st=0:d=1,fade=t=out:st={self.duration-1}:d=1"
-            )
-            cmd = [
-                "ffmpeg", "-y",
-                "-loop", "1", "-framerate", str(fps), "-t", str(self.duration), "-i", self.image_path,
-                "-i", bg_img,
-                "-filter_complex", filter_complex,
-                "-c:v", "libx264",
-                "-pix_fmt", "yuv420p",
-                "-r", str(fps),
-                self.output_path
-            ]
+                    cmd = [
+                        "ffmpeg", "-y",
+                        "-loop", "1", "-framerate", str(fps), "-t", str(self.duration), "-i", frame_path,
+                        "-vf", f"{fade},format=yuv420p",
+                        "-c:v", "libx264", "-tune", "stillimage",
+                        "-pix_fmt", "yuv420p",
+                        "-r", str(fps),
+                        self.output_path
+                    ]
+                    runner = FFmpegRunner(self, duration=self.duration, progress_range=(20, 100))
+                    runner.run(cmd)
+                finally:
+                    if os.path.exists(frame_path):
+                        os.remove(frame_path)
+            else:
+                # 单次处理：循环输入图片，整个合成滤镜图逐帧运行
+                cmd = [
+                    "ffmpeg", "-y",
+                    "-loop", "1", "-framerate", str(fps), "-t", str(self.duration), "-i", self.image_path,
+                    "-filter_complex", f"{composite},{fade},format=yuv420p",
+                    "-c:v", "libx264",
+                    "-pix_fmt", "yuv420p",
+                    "-r", str(fps),
+                    self.output_path
+                ]
+                runner = FFmpegRunner(self, duration=self.duration, progress_range=(10, 100))
+                runner.run(cmd)
 
-            subprocess.run(cmd)
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+                return
+            if runner.returncode != 0:
+                self.finished.emit(False, f"合成视频失败: {runner.error_text}")
+                return
 
             self.progress_updated.emit(100)
             self.log_updated.emit(f"生成完成: {os.path.basename(self.output_path)}")
@@ -131,100 +1530,209 @@ class ImageToVideoThread(WorkerThread):
             self.finished.emit(False, f"转换异常: {str(e)}")
 
 class SRTGenerationThread(WorkerThread):
-    """字幕生成线程"""
+    """字幕生成线程
+
+    backend="server" 时从服务池取一个常驻 whisper 服务（模型只加载一次，批量时每个槽位一个服务），
+    backend="cli" 时每次启动 whisper-cli（需重新激活环境并加载模型），
+    backend="parallel" 时按静音切分为 parallel_jobs 段，多个 whisper-cli 分核并行转写。
+
+    识别结果以词级时间轴按 (音频内容哈希, 模型, 语言) 缓存，
+    同一音频只改每行字符数时直接从缓存重新分行，不再推理。
+    """
 
-    def __init__(self, audio_path, output_path, max_line_length=30):
+    def __init__(self, audio_path, output_path, max_line_length=30, backend="server",
+                 parallel_jobs=4, language="zh", use_cache=True, threads=None):
         super().__init__()
         self.audio_path = audio_path
         self.output_path = output_path
         self.max_line_length = max_line_length
+        self.backend = backend
+        self.parallel_jobs = max(1, parallel_jobs)
+        self.language = language
+        self.use_cache = use_cache
+        self.threads = threads or os.cpu_count() or 4  # 本任务可用的 CPU 线程数（批量时按槽位分配）
 
     def run(self):
         try:
             self.progress_updated.emit(10)
             self.log_updated.emit(f"开始处理: {os.path.basename(self.audio_path)}")
 
-            # 检查音频格式并转换
-            ext = os.path.splitext(self.audio_path)[1].lower()
-            wav_path = self.audio_path
-            
-            srt_dir = os.path.join(os.getcwd(), 'SRT')
-            os.makedirs(srt_dir, exist_ok=True)
-            
-            if ext != ".wav":
-                base_name = os.path.splitext(os.path.basename(self.audio_path))[0]
-                ts = datetime.now().strftime("%Y%m%d%H%M")
-                wav_path = os.path.join(srt_dir, f"{base_name}-{ts}.wav")
-
-                self.log_updated.emit("正在转换音频为WAV格式...")
-                cmd_ffmpeg = ["ffmpeg", "-y", "-i", self.audio_path, wav_path]
-                result = subprocess.run(cmd_ffmpeg, capture_output=True, text=True)
-                if result.returncode != 0:
-                    self.finished.emit(False, f"音频转换失败: {result.stderr}")
+            cache_path = transcript_cache_path(file_content_hash(self.audio_path),
+                                               WHISPER_MODEL_NAME, self.language)
+            words = load_cached_transcript(cache_path) if self.use_cache else None
+            if words is not None:
+                self.log_updated.emit("命中识别缓存，按当前字符数重新分行")
+            else:
+                words = self.transcribe()
+                if words is None:
                     return
+                save_cached_transcript(cache_path, words, WHISPER_MODEL_NAME, self.language)
 
-            self.progress_updated.emit(30)
+            self.progress_updated.emit(90)
+            SubtitleTrack.from_cues(segment_words(words, self.max_line_length)).write(self.output_path)
 
-            # whisper.cpp命令
-            aipath = os.environ.get("AIPATH")
-            if not aipath:
-                self.finished.emit(False, "未检测到AIPATH AI目录变量")
-                return
-            whisper_bin = os.path.join(aipath, "whisper.cpp/build/bin/whisper-cli")
-            whisper_model = os.path.join(aipath, "whisper.cpp/models/ggml-large-v3-turbo-q5_0.bin")
-            
-            if not os.path.exists(whisper_bin):
-                self.finished.emit(False, f"找不到whisper程序: {whisper_bin}")
-                return
-            if not os.path.exists(whisper_model):
-                self.finished.emit(False, f"找不到whisper模型: {whisper_model}")
-                return
+            self.progress_updated.emit(100)
+            self.log_updated.emit(f"字幕生成完成: {os.path.basename(self.output_path)}")
+            self.finished.emit(True, self.output_path)
 
-            of_path = os.path.splitext(self.output_path)[0]
-            threads = os.cpu_count() or 4
-
-            cmd_whisper = [
-                whisper_bin,
-                "-m", whisper_model,
-                "-f", wav_path,
-                "-l", "zh",
-                "-ml", str(self.max_line_length),
-                "-osrt",
-                "-of", of_path,
-                "-t", str(threads),
-            ]
+        except Exception as e:
+            self.finished.emit(False, f"字幕生成异常: {str(e)}")
 
-            self.log_updated.emit("正在生成字幕(Whisper)...")
-            
-            # 使用更可靠的 shell 命令执行方式
-            shell_cmd = f"source ~/.zshrc && conda activate modelscope && {' '.join(cmd_whisper)}"
-            
-            # 记录执行的命令（隐藏敏感信息如果需要，这里主要是本地路径）
-            print(f"Executing: {shell_cmd}")
-            
-            result = subprocess.run(shell_cmd, shell=True, capture_output=True, text=True, executable="/bin/zsh")
+    def transcribe(self):
+        """预处理音频并按所选后端识别，返回词级时间轴；失败时发出 finished 并返回 None"""
+        # 统一转为 16kHz 单声道 s16，同一音频重复生成字幕时直接复用缓存
+        self.log_updated.emit("正在预处理音频(16kHz 单声道)...")
+        try:
+            wav_path = prepare_whisper_audio(self.audio_path, self, progress_range=(10, 30))
+            get_whisper_paths()
+        except RuntimeError as e:
+            self.finished.emit(False, "已取消" if self.is_cancelled else str(e))
+            return None
 
-            self.progress_updated.emit(80)
+        self.progress_updated.emit(30)
 
-            # 检查输出文件
-            if os.path.exists(self.output_path):
-                self.progress_updated.emit(100)
-                self.log_updated.emit(f"字幕生成完成: {os.path.basename(self.output_path)}")
-                self.finished.emit(True, self.output_path)
+        if self.backend == "server":
+            words, error = self.transcribe_server(wav_path)
+        elif self.backend == "parallel":
+            words, error = self.transcribe_parallel(wav_path)
+        else:
+            words, error = self.transcribe_cli(wav_path)
+
+        if self.is_cancelled:
+            self.finished.emit(False, "已取消")
+            return None
+        if words is None:
+            self.finished.emit(False, f"字幕生成失败: {error[:200]}")
+            return None
+        return words
+
+    def transcribe_server(self, wav_path):
+        """通过常驻服务转写（从服务池取一个 self.threads 线程的服务独占使用），等待期间响应取消"""
+        pool = get_whisper_server_pool()
+        server = pool.acquire(self.threads)
+        try:
+            if not server.is_running():
+                self.log_updated.emit("正在启动whisper服务并加载模型（仅首次）...")
+            elif server.pending_count():
+                self.log_updated.emit(f"whisper服务排队中，前方 {server.pending_count()} 个任务")
             else:
-                # 尝试查找可能的副作用文件（例如 .srt.srt）
-                potential_path = of_path + ".srt.srt"
-                if os.path.exists(potential_path):
-                     os.rename(potential_path, self.output_path)
-                     self.progress_updated.emit(100)
-                     self.log_updated.emit(f"字幕生成完成: {os.path.basename(self.output_path)}")
-                     self.finished.emit(True, self.output_path)
-                else:
-                    error_msg = result.stderr if result.stderr else result.stdout
-                    self.finished.emit(False, f"字幕生成失败: {error_msg[:200]}")
+                self.log_updated.emit("正在生成字幕(Whisper 服务)...")
+
+            # 不限制分段长度，保留 whisper 自身的分段，词级时间取自 token 时间戳
+            future = server.submit(wav_path, language=self.language, response_format="verbose_json")
+            while True:
+                if self.is_cancelled:
+                    future.cancel()  # 已在推理中的请求无法中断，结果直接丢弃
+                    return None, "已取消"
+                try:
+                    result = future.result(timeout=0.5)
+                    break
+                except FutureTimeoutError:
+                    continue
+                except Exception as e:
+                    return None, str(e)
+        finally:
+            pool.release(server)
+
+        self.progress_updated.emit(80)
+        return parse_whisper_verbose_words(result), ""
+
+    def whisper_cli_command(self, wav_path, of_path, threads):
+        """whisper-cli 词级输出命令（-ojf 输出带 token 时间戳的完整 JSON，保留 whisper 自身分段）"""
+        bin_dir, whisper_model = get_whisper_paths()
+        return [os.path.join(bin_dir, "whisper-cli"), "-m", whisper_model, "-f", wav_path,
+                "-l", self.language, "-ojf", "-of", of_path, "-t", str(threads)]
+
+    def run_whisper_cli(self, cmd, of_path):
+        """执行 whisper-cli 并读取词级结果，返回 (words, error)"""
+        if not os.path.exists(cmd[0]):
+            return None, f"找不到whisper程序: {cmd[0]}"
+        process = run_in_whisper_env(cmd, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.PIPE, text=True)
+        self.processes.add(process)
+        try:
+            _, stderr = process.communicate()
+        finally:
+            self.processes.discard(process)
+        json_path = of_path + ".json"
+        if not os.path.exists(json_path):
+            return None, stderr or "whisper 未生成结果"
+        with open(json_path, "rb") as f:
+            return parse_whisper_full_json_words(f.read()), ""
+
+    def transcribe_parallel(self, wav_path):
+        """按静音切分后多个 whisper-cli 并行转写，再按实际片段时长平移时间轴合并"""
+        duration = get_media_duration(wav_path)
+        if not duration:
+            return None, "无法获取音频时长"
+
+        scratch_dir = make_scratch_dir("whisper-")
+        try:
+            self.log_updated.emit("正在检测静音切分点...")
+            points = choose_split_points(duration, detect_silences(wav_path), self.parallel_jobs)
+
+            # 输入已是 16kHz 单声道 PCM，直接流复制切分
+            cmd = ["ffmpeg", "-y", "-v", "error", "-i", wav_path, "-c:a", "copy"]
+            if points:
+                cmd += ["-f", "segment", "-segment_times", ",".join(f"{p:.3f}" for p in points),
+                        os.path.join(scratch_dir, "chunk_%03d.wav")]
+            else:
+                cmd.append(os.path.join(scratch_dir, "chunk_000.wav"))
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                return None, f"音频切分失败: {result.stderr}"
+
+            chunks = sorted(os.path.join(scratch_dir, name) for name in os.listdir(scratch_dir)
+                            if name.startswith("chunk_") and name.endswith(".wav"))
+            # 切分点落在包边界上，偏移量以各片段实际时长累加为准
+            offsets, total = [], 0.0
+            for info in probe_paths(chunks):
+                offsets.append(int(round(total * 1000)))
+                total += info["duration"] if info else 0.0
+
+            threads = max(1, self.threads // len(chunks))
+            self.log_updated.emit(f"正在并行生成字幕: {len(chunks)} 段 × {threads} 线程")
+
+            def transcribe_chunk(chunk):
+                of_path = os.path.splitext(chunk)[0]
+                words, error = self.run_whisper_cli(
+                    self.whisper_cli_command(chunk, of_path, threads), of_path)
+                if words is None:
+                    raise RuntimeError(f"{os.path.basename(chunk)}: {error[-200:]}")
+                return words
+
+            with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = {pool.submit(transcribe_chunk, c): i for i, c in enumerate(chunks)}
+                chunk_words = [None] * len(chunks)
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        chunk_words[futures[future]] = future.result()
+                        self.progress_updated.emit(30 + 50 * done // len(chunks))
+                except Exception as e:
+                    for process in list(self.processes):
+                        process.kill()
+                    return None, str(e)
+
+            words = []
+            for offset, items in zip(offsets, chunk_words):
+                words.extend((start + offset, end + offset, text, segment_end)
+                             for start, end, text, segment_end in items)
+            return words, ""
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
 
-        except Exception as e:
-            self.finished.emit(False, f"字幕生成异常: {str(e)}")
+    def transcribe_cli(self, wav_path):
+        """单次启动 whisper-cli 转写"""
+        self.log_updated.emit("正在生成字幕(Whisper)...")
+        of_path = os.path.splitext(self.output_path)[0]
+        cmd = self.whisper_cli_command(wav_path, of_path, self.threads)
+        try:
+            words, error = self.run_whisper_cli(cmd, of_path)
+        finally:
+            if os.path.exists(of_path + ".json"):
+                os.remove(of_path + ".json")
+        self.progress_updated.emit(80)
+        return words, error
 
 class SRTToTextThread(WorkerThread):
     """SRT转文本线程"""
@@ -238,110 +1746,1195 @@ class SRTToTextThread(WorkerThread):
         try:
             self.progress_updated.emit(10)
 
-            # 检测编码
-            with open(self.srt_path, 'rb') as f:
-                raw = f.read()
-                detect_result = chardet.detect(raw)
-                enc = detect_result['encoding'] or 'utf-8'
-
-            self.progress_updated.emit(30)
+            srt_file_to_text(self.srt_path, self.output_path)
+            self.progress_updated.emit(100)
+            self.finished.emit(True, self.output_path)
 
-            lines = []
-            for line in raw.decode(enc, errors='replace').splitlines():
-                line = line.strip()
-                if line.isdigit():
-                    continue
-                if re.match(r"\d{2}:\d{2}:\d{2},\d{3} --> \d{2}:\d{2}:\d{2},\d{3}", line):
-                    continue
-                if not line:
-                    continue
-                lines.append(line)
+        except Exception as e:
+            self.finished.emit(False, f"SRT转文本异常: {str(e)}")
 
-            merged_text = ''.join(lines)
+class SubtitleAdjustThread(WorkerThread):
+    """调整字幕线程：沿用原 SRT 的时间轴，逐条替换为新的字幕文本"""
 
-            with open(self.output_path, 'w', encoding='utf-8') as f:
-                f.write(merged_text)
+    def __init__(self, srt_path, new_lines, output_path):
+        super().__init__()
+        self.srt_path = srt_path
+        self.new_lines = new_lines
+        self.output_path = output_path
 
+    def run(self):
+        try:
+            track = SubtitleTrack.from_file(self.srt_path)
+            if len(track) == 0:
+                self.finished.emit(False, "无法从SRT文件中提取时间轴信息")
+                return
+            self.progress_updated.emit(50)
+            track.with_texts(self.new_lines).write(self.output_path)
             self.progress_updated.emit(100)
             self.finished.emit(True, self.output_path)
+        except Exception as e:
+            self.finished.emit(False, f"调整字幕失败: {str(e)}")
+
+class RateLimiter:
+    """令牌桶限速器（线程安全）：平均每秒 rate 次，最多累积 burst 次突发"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """取得一个令牌，不足时阻塞等待"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+API_POOL_WORKERS = 16
+API_REQUESTS_PER_SECOND = 5
+
+_api_pool = None
+_api_rate_limiter = None
+_api_pool_lock = threading.Lock()
+
+def get_api_pool():
+    """全局共享的接口请求线程池，翻译等所有在线请求共用"""
+    global _api_pool
+    with _api_pool_lock:
+        if _api_pool is None:
+            _api_pool = ThreadPoolExecutor(max_workers=API_POOL_WORKERS, thread_name_prefix="api")
+        return _api_pool
+
+def get_api_rate_limiter():
+    """全局接口限速器，所有线程发请求前取令牌"""
+    global _api_rate_limiter
+    with _api_pool_lock:
+        if _api_rate_limiter is None:
+            _api_rate_limiter = RateLimiter(API_REQUESTS_PER_SECOND)
+        return _api_rate_limiter
+
+def run_in_api_pool(jobs, max_in_flight, on_result, is_cancelled):
+    """以滑动窗口把 jobs 提交到共享接口池，本次调用的在途任务不超过 max_in_flight
+
+    jobs 为 (key, fn, args) 的可迭代对象，按顺序提交；每个任务完成后在调用线程中执行
+    on_result(key, result, error)，成功时 error 为 None。is_cancelled() 为真或 on_result
+    返回 True 后不再提交新任务：排队中的撤下，已在执行的等其结束（任务自身应检查取消）
+    但不再回调。
+    """
+    pool = get_api_pool()
+    remaining = iter(jobs)
+    in_flight = {}
+    stopped = False
+    while True:
+        while not stopped and len(in_flight) < max_in_flight and not is_cancelled():
+            job = next(remaining, None)
+            if job is None:
+                break
+            key, fn, args = job
+            in_flight[pool.submit(fn, *args)] = key
+        if stopped or is_cancelled():
+            for future in in_flight:
+                future.cancel()
+            wait(in_flight)
+            return
+        if not in_flight:
+            return
+        finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in finished:
+            key = in_flight.pop(future)
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, e
+            if on_result(key, result, error):
+                stopped = True
+
+class SiliconFlowClient:
+    """SiliconFlow 接口客户端（线程安全）
+
+    所有请求共用一个 requests.Session，连接池保持长连接，避免每次重新握手；
+    各接口按自身特点设置 (连接, 读取) 超时；网络错误、429 和 5xx 自动退避重试
+    （优先遵循 Retry-After），发出前经全局限速器取令牌。每个接口记录请求数、
+    重试数、失败数和延迟分布，供日志输出。
+    """
+
+    BASE_URL = "https://api.siliconflow.cn/v1"
+    DEFAULT_TIMEOUT = (5, 30)
+    TIMEOUTS = {
+        "chat/completions": (5, 120),
+        "audio/speech": (5, 60),
+        "uploads/audio/voice": (5, 120),
+        "audio/voice/list": (5, 15),
+        "audio/voice/deletions": (5, 15),
+    }
+    MAX_RETRIES = 3
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    # 重复提交会产生副作用（重复创建音色）的接口：只在连接超时或 429 时重试，
+    # 这两种情况下请求确定未被服务端处理
+    NON_IDEMPOTENT = {"uploads/audio/voice"}
+    LATENCY_SAMPLES = 200  # 每个接口保留最近的延迟样本数
+
+    def __init__(self, pool_size=API_POOL_WORKERS):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.metrics_lock = threading.Lock()
+        self.metrics = {}
+
+    @staticmethod
+    def get_api_key():
+        return os.environ.get("SiliconCloud_API_KEY")
+
+    def request(self, method, endpoint, api_key=None, retries=None, timeout=None, **kwargs):
+        """发送请求并返回最终响应；重试用尽仍是网络错误时抛出 requests.RequestException
+
+        非 200 响应原样返回，由调用方判断 status_code。上传文件时 files 中应传 bytes，
+        以便重试时重新发送。stream=True 时调用方负责关闭响应。
+        会阻塞在限速和退避上，不要在 GUI 线程调用。
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.setdefault("Authorization", f"Bearer {api_key or self.get_api_key()}")
+        timeout = timeout or self.TIMEOUTS.get(endpoint, self.DEFAULT_TIMEOUT)
+        retries = self.MAX_RETRIES if retries is None else retries
+        url = f"{self.BASE_URL}/{endpoint}"
+        idempotent = endpoint not in self.NON_IDEMPOTENT
+        retry_errors = requests.RequestException if idempotent else requests.ConnectTimeout
+        retry_status = self.RETRY_STATUS if idempotent else {429}
+
+        for attempt in range(retries + 1):
+            get_api_rate_limiter().acquire()
+            start = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, headers=headers, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                self.record(endpoint, time.perf_counter() - start, ok=False, retried=attempt > 0)
+                if attempt >= retries or not isinstance(e, retry_errors):
+                    raise
+                time.sleep(self.backoff(attempt))
+                continue
+            ok = resp.status_code < 400
+            self.record(endpoint, time.perf_counter() - start, ok=ok, retried=attempt > 0)
+            if resp.status_code not in retry_status or attempt >= retries:
+                return resp
+            delay = self.backoff(attempt, resp.headers.get("Retry-After"))
+            resp.close()
+            time.sleep(delay)
+
+    def get(self, endpoint, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+    @staticmethod
+    def backoff(attempt, retry_after=None):
+        """退避时间：优先 Retry-After（秒），否则指数增长并加随机抖动"""
+        try:
+            if retry_after is not None:
+                return min(60.0, float(retry_after))
+        except ValueError:
+            pass
+        return min(30, 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def record(self, endpoint, elapsed, ok, retried):
+        with self.metrics_lock:
+            stats = self.metrics.get(endpoint)
+            if stats is None:
+                stats = self.metrics[endpoint] = {
+                    "requests": 0, "errors": 0, "retries": 0, "total": 0.0,
+                    "samples": deque(maxlen=self.LATENCY_SAMPLES)
+                }
+            stats["requests"] += 1
+            stats["errors"] += 0 if ok else 1
+            stats["retries"] += 1 if retried else 0
+            stats["total"] += elapsed
+            stats["samples"].append(elapsed)
+
+    def latency_summary(self, endpoint=None):
+        """各接口延迟统计（平均 / p50 / p95，单位毫秒），返回多行文本"""
+        lines = []
+        with self.metrics_lock:
+            for name, stats in sorted(self.metrics.items()):
+                if endpoint is not None and name != endpoint:
+                    continue
+                samples = sorted(stats["samples"])
+                p50 = samples[len(samples) // 2] * 1000
+                p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000
+                lines.append(f"{name}: {stats['requests']} 次请求，重试 {stats['retries']}，"
+                             f"失败 {stats['errors']}，平均 {stats['total'] * 1000 / stats['requests']:.0f} ms，"
+                             f"p50 {p50:.0f} ms，p95 {p95:.0f} ms")
+        return "\n".join(lines)
+
+    def close(self):
+        self.session.close()
+
+_siliconflow_client = None
+
+def get_siliconflow_client():
+    """全局共享的 SiliconFlow 客户端，复用同一连接池"""
+    global _siliconflow_client
+    with _api_pool_lock:
+        if _siliconflow_client is None:
+            _siliconflow_client = SiliconFlowClient()
+            atexit.register(_siliconflow_client.close)
+        return _siliconflow_client
+
+class SiliconFlowRequestThread(WorkerThread):
+    """在后台线程发出一次 SiliconFlow 请求，避免限速等待和重试退避卡住界面
+
+    finished(True, 响应文本) 表示 HTTP 200，否则 finished(False, 错误信息)。
+    """
+
+    def __init__(self, method, endpoint, **kwargs):
+        super().__init__()
+        self.method = method
+        self.endpoint = endpoint
+        self.kwargs = kwargs
 
+    def run(self):
+        try:
+            resp = get_siliconflow_client().request(self.method, self.endpoint, **self.kwargs)
+            if resp.status_code == 200:
+                self.finished.emit(True, resp.text)
+            else:
+                self.finished.emit(False, resp.text or f"HTTP {resp.status_code}")
         except Exception as e:
-            self.finished.emit(False, f"SRT转文本异常: {str(e)}")
+            self.finished.emit(False, str(e))
 
-class SRTTranslateThread(WorkerThread):
-    """SRT翻译线程"""
+class TranslationMemory(SQLiteStore):
+    """翻译记忆，键为 (原文, 目标语言, 模型)，超出容量时按最近访问时间淘汰"""
 
-    def __init__(self, srt_path, output_path, target_language="English"):
-        super().__init__()
+    QUERY_BATCH = 500  # 单条 SQL 的参数个数上限内分批查询
+
+    def __init__(self, db_path, max_entries=200000):
+        self.max_entries = max_entries
+        super().__init__(db_path)
+
+    def init_schema(self, conn):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS translation_memory ("
+            "source TEXT, target TEXT, model TEXT, translation TEXT, last_access REAL, "
+            "PRIMARY KEY (source, target, model))"
+        )
+
+    def get_many(self, sources, target, model):
+        """批量查询，返回 {原文: 译文}（仅包含命中的条目）"""
+        sources = list(sources)
+        found = {}
+        with self.lock, self.connect() as conn:
+            for start in range(0, len(sources), self.QUERY_BATCH):
+                batch = sources[start:start + self.QUERY_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT source, translation FROM translation_memory "
+                    f"WHERE target = ? AND model = ? AND source IN ({marks})",
+                    [target, model] + batch
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE translation_memory SET last_access = ? WHERE source = ? AND target = ? AND model = ?",
+                    [(now, source, target, model) for source in found]
+                )
+                conn.commit()
+        return found
+
+    def put_many(self, pairs, target, model):
+        """写入 [(原文, 译文), ...]"""
+        now = time.time()
+        with self.lock, self.connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translation_memory (source, target, model, translation, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(source, target, model, translation, now) for source, translation in pairs]
+            )
+            count = conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM translation_memory WHERE rowid IN "
+                    "(SELECT rowid FROM translation_memory ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            conn.commit()
+
+_translation_memory = None
+_translation_memory_lock = threading.Lock()
+
+def get_translation_memory():
+    """全局翻译记忆实例"""
+    global _translation_memory
+    with _translation_memory_lock:
+        if _translation_memory is None:
+            _translation_memory = TranslationMemory(os.path.join(get_cache_dir(), "translation_memory.sqlite3"))
+        return _translation_memory
+
+def estimate_tokens(text):
+    """粗略估算 token 数：CJK 字符约 1 token/字，其余约 4 字符/token"""
+    cjk = sum(1 for ch in text if ord(ch) >= 0x2E80)
+    return cjk + (len(text) - cjk) // 4 + 1
+
+class SRTTranslator:
+    """SRT 翻译器（不依赖 Qt，单文件和批量翻译共用）
+
+    字幕按 token 预算分段，多段并发请求，每段失败单独重试；
+    译文按条目序号回填，时间轴始终取自原文件。已完成的分段实时追加到
+    输出文件旁的 .part（JSONL），失败或中断后再次翻译同一输出会从中续传。
+    翻译记忆命中的条目不再请求接口。分段请求提交到全局共享的接口线程池，
+    经共享的 SiliconFlow 客户端（长连接、限速、重试）发出，多个文件同时翻译时
+    总请求速率仍受控。
+    """
+
+    ENDPOINT = "chat/completions"
+    MODEL = "Qwen/Qwen3-Next-80B-A3B-Instruct"
+    CHUNK_TOKEN_BUDGET = 1500  # 每段原文的 token 上限
+    MAX_CUES_PER_CHUNK = 80
+    MAX_RETRIES = 3
+    ID_LINE_RE = re.compile(r"^\s*\[\[(\d+)\]\]\s?(.*)$")
+
+    def __init__(self, srt_path, output_path, target_language="English", max_workers=4,
+                 log=None, progress=None, is_cancelled=None):
         self.srt_path = srt_path
         self.output_path = output_path
         self.target_language = target_language
+        self.max_workers = max(1, max_workers)  # 本文件同时在途的分段数
+        self.part_path = output_path + ".part"
+        self.part_lock = threading.Lock()
+        self.log = log or (lambda msg: None)
+        self.progress = progress or (lambda value: None)
+        self.is_cancelled = is_cancelled or (lambda: False)
+
+    def translate(self):
+        """执行翻译，返回 (是否成功, 输出路径或错误信息)"""
+        self.progress(10)
+
+        track = SubtitleTrack.from_file(self.srt_path)
+        texts = track.texts
+        if not texts:
+            return False, "未解析到字幕条目"
+
+        api_key = SiliconFlowClient.get_api_key()
+        if not api_key:
+            return False, "未检测到API KEY"
+
+        translated = self.load_partial(len(texts))
+        todo = [i for i in range(len(texts)) if i not in translated and texts[i].strip()]
+        if translated:
+            self.log(f"从上次中断处续传，已完成 {len(translated)}/{len(texts)} 条")
+
+        # 翻译记忆命中的条目直接回填，同一文件内重复的句子只请求一次
+        memory = get_translation_memory()
+        hits = memory.get_many({texts[i] for i in todo}, self.target_language, self.MODEL)
+        misses = []
+        for i in todo:
+            if texts[i] in hits:
+                translated[i] = hits[texts[i]]
+            else:
+                misses.append(i)
+        first_index = {}
+        for i in misses:
+            first_index.setdefault(texts[i], i)
+        if todo:
+            self.log(f"翻译记忆命中 {len(todo) - len(misses)}/{len(todo)} 条"
+                     f"（{(len(todo) - len(misses)) * 100 // len(todo)}%）")
+
+        chunks = self.make_chunks(texts, list(first_index.values()))
+        self.progress(20)
+        self.log(f"共 {len(texts)} 条字幕，{len(first_index)} 条需请求，分 {len(chunks)} 段并发翻译")
+
+        # 滑动窗口提交到共享线程池，本文件在途分段不超过 max_workers
+        failed = done = 0
+
+        def on_result(chunk, result, error):
+            nonlocal failed, done
+            done += 1
+            if error is None:
+                translated.update(result)
+                self.append_partial(result)
+                memory.put_many([(texts[i], text) for i, text in result.items()],
+                                self.target_language, self.MODEL)
+            else:
+                failed += 1
+                self.log(f"分段翻译失败: {str(error)[:200]}")
+            self.progress(20 + 75 * done // max(1, len(chunks)))
+
+        run_in_api_pool(((chunk, self.translate_chunk, (api_key, texts, chunk)) for chunk in chunks),
+                        self.max_workers, on_result, self.is_cancelled)
+        if chunks:
+            self.log(f"接口延迟 {get_siliconflow_client().latency_summary(self.ENDPOINT)}")
+
+        if self.is_cancelled():
+            return False, "已取消"
+
+        for i in misses:
+            if i not in translated and first_index[texts[i]] in translated:
+                translated[i] = translated[first_index[texts[i]]]
+
+        # 按序号回填；失败分段暂保留原文，以便字幕文件可直接使用
+        track.with_texts([translated.get(i, text) for i, text in enumerate(texts)]).write(self.output_path)
+
+        if failed:
+            return False, (f"{failed}/{len(chunks)} 段翻译失败，未翻译条目保留原文，"
+                           f"重新翻译将从断点续传: {self.output_path}")
+
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+        self.progress(100)
+        return True, self.output_path
+
+    def make_chunks(self, texts, indices):
+        """按 token 预算和条数上限把待翻译条目切分为若干段"""
+        chunks, current, budget = [], [], 0
+        for i in indices:
+            cost = estimate_tokens(texts[i]) + 4
+            if current and (budget + cost > self.CHUNK_TOKEN_BUDGET or len(current) >= self.MAX_CUES_PER_CHUNK):
+                chunks.append(current)
+                current, budget = [], 0
+            current.append(i)
+            budget += cost
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def translate_chunk(self, api_key, texts, chunk):
+        """翻译一段，返回 {条目序号: 译文}；网络错误、限流或序号缺失时退避重试"""
+        # 条目内换行用 <br> 占位，保证每个序号只占一行
+        source = "\n".join(f"[[{i}]] {texts[i].replace(chr(10), '<br>')}" for i in chunk)
+        prompt = (f"将下面每一行字幕翻译为{self.target_language}。每行开头的 [[序号]] 标记原样保留，"
+                  f"一行对应一行，不要合并、拆分或遗漏，<br> 原样保留，只输出翻译结果，不要额外说明。\n\n"
+                  + source)
+        payload = {
+            "model": self.MODEL,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": False,
+            "max_tokens": min(8192, estimate_tokens(source) * 3 + 256),
+            "response_format": {"type": "text"}
+        }
+        client = get_siliconflow_client()
+
+        # 网络错误、限流和 5xx 由客户端重试，这里只重试响应无法解析或译文序号缺失的情况
+        last_error = ""
+        for attempt in range(self.MAX_RETRIES + 1):
+            if self.is_cancelled():
+                raise RuntimeError("已取消")
+            if attempt:
+                time.sleep(SiliconFlowClient.backoff(attempt))
+            try:
+                resp = client.post(self.ENDPOINT, api_key=api_key, json=payload)
+            except requests.RequestException as e:
+                last_error = str(e)
+                break
+            if resp.status_code != 200:
+                last_error = f"HTTP {resp.status_code}: {resp.text[:200]}"
+                break
+            try:
+                content = resp.json()["choices"][0]["message"]["content"] or ""
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                # 网关偶尔返回 200 但正文不是完整 JSON，按可重试错误处理
+                last_error = f"响应格式异常: {e!r}"
+                continue
+            result = {}
+            for line in content.splitlines():
+                m = self.ID_LINE_RE.match(line)
+                if m and int(m.group(1)) in chunk:
+                    result[int(m.group(1))] = m.group(2).strip().replace("<br>", "\n")
+            missing = [i for i in chunk if not result.get(i)]
+            if not missing:
+                return result
+            last_error = f"译文缺少 {len(missing)} 条"
+        raise RuntimeError(f"条目 {chunk[0] + 1}-{chunk[-1] + 1}: {last_error}")
+
+    def part_header(self):
+        """.part 首行：原文件内容哈希和目标语言，不一致时不续传"""
+        return {"source": file_content_hash(self.srt_path), "target": self.target_language}
+
+    def load_partial(self, cue_count):
+        """读取 .part 中已完成的译文（序号超出范围的视为无效）"""
+        translated = {}
+        if not os.path.exists(self.part_path):
+            return translated
+        with open(self.part_path, 'r', encoding='utf-8') as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = None
+            stale = header != self.part_header()
+            for line in ([] if stale else f):
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue  # 中断时可能留下半行
+                if 0 <= item.get("index", -1) < cue_count:
+                    translated[item["index"]] = item["text"]
+        if stale:
+            os.remove(self.part_path)
+        return translated
+
+    def append_partial(self, result):
+        with self.part_lock:
+            if not os.path.exists(self.part_path):
+                with open(self.part_path, 'w', encoding='utf-8') as f:
+                    f.write(json.dumps(self.part_header(), ensure_ascii=False) + "\n")
+            with open(self.part_path, 'a', encoding='utf-8') as f:
+                for index, text in sorted(result.items()):
+                    f.write(json.dumps({"index": index, "text": text}, ensure_ascii=False) + "\n")
+
+class SRTTranslateThread(WorkerThread):
+    """SRT翻译线程"""
+
+    def __init__(self, srt_path, output_path, target_language="English", max_workers=4):
+        super().__init__()
+        self.translator = SRTTranslator(srt_path, output_path, target_language, max_workers,
+                                        log=self.log_updated.emit,
+                                        progress=self.progress_updated.emit,
+                                        is_cancelled=lambda: self.is_cancelled)
 
     def run(self):
         try:
-            self.progress_updated.emit(10)
+            self.finished.emit(*self.translator.translate())
+        except Exception as e:
+            self.finished.emit(False, f"翻译异常: {str(e)}")
 
-            # 检测编码
-            with open(self.srt_path, 'rb') as f:
-                raw = f.read()
-                detect_result = chardet.detect(raw)
-                enc = detect_result['encoding'] or 'utf-8'
+class SRTBatchThread(WorkerThread):
+    """字幕文件夹批量处理线程
 
-            srt_content = raw.decode(enc, errors='replace')
+    mode="text" 时 SRT 转文本在进程池中执行（CPU 密集）；
+    mode="translate" 时多个文件同时翻译，分段请求统一走全局接口池和限速器。
+    输出按输入目录结构镜像到 output_dir，结束后写出 summary.csv 记录每个文件的耗时。
+    """
 
-            self.progress_updated.emit(30)
+    FILE_WORKERS = 4  # 翻译模式下同时处理的文件数
 
-            # API翻译
-            api_key = os.environ.get("SiliconCloud_API_KEY")
-            if not api_key:
-                self.finished.emit(False, "未检测到API KEY")
+    def __init__(self, input_dir, output_dir, mode="text", target_language="English", max_workers=4):
+        super().__init__()
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.mode = mode
+        self.target_language = target_language
+        self.max_workers = max_workers
+
+    def collect_files(self):
+        """递归收集 SRT 文件，返回相对路径列表（跳过输出目录本身）"""
+        output_dir = os.path.abspath(self.output_dir)
+        files = []
+        for root, dirs, names in os.walk(self.input_dir):
+            dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != output_dir)
+            for name in sorted(names):
+                if name.lower().endswith(".srt"):
+                    files.append(os.path.relpath(os.path.join(root, name), self.input_dir))
+        return files
+
+    def output_path_for(self, rel_path):
+        base = os.path.splitext(os.path.join(self.output_dir, rel_path))[0]
+        if self.mode == "text":
+            return base + ".txt"
+        return f"{base}-{self.target_language}.srt"
+
+    def run(self):
+        try:
+            files = self.collect_files()
+            if not files:
+                self.finished.emit(False, "文件夹中没有找到SRT文件")
                 return
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.log_updated.emit(f"找到 {len(files)} 个SRT文件，开始批量处理")
+
+            start = time.perf_counter()
+            rows = self.run_text(files) if self.mode == "text" else self.run_translate(files)
+            report_path = self.write_report(rows, time.perf_counter() - start)
+
+            failed = sum(1 for row in rows if row[1] != "成功")
+            if self.is_cancelled:
+                self.finished.emit(False, f"已取消，已完成的结果和报告已保存: {report_path}")
+            elif failed:
+                self.finished.emit(False, f"{failed}/{len(files)} 个文件失败，详见报告: {report_path}")
+            else:
+                self.progress_updated.emit(100)
+                self.finished.emit(True, report_path)
 
-            url = "https://api.siliconflow.cn/v1/chat/completions"
-            prompt = f"帮我将输入的srt字幕文本内容翻译转换为{self.target_language}。保持srt文本结构，序号，时间都不变，只需要翻译内容，并输出srt格式的翻译内容就可以，不需要其他额外注释和说明。\n\n" + srt_content
+        except Exception as e:
+            self.finished.emit(False, f"批量处理异常: {str(e)}")
+
+    def collect_results(self, futures, total):
+        """按完成顺序收集 (相对路径, 状态, 耗时, 说明)，取消时撤销尚未开始的任务
+
+        每个任务返回耗时秒数，失败时抛出异常。
+        """
+        rows = []
+        cancelling = False
+        for done, future in enumerate(as_completed(futures), 1):
+            rel_path = futures[future]
+            if future.cancelled():
+                rows.append((rel_path, "已取消", 0.0, ""))
+            else:
+                try:
+                    rows.append((rel_path, "成功", future.result(), ""))
+                except Exception as e:
+                    status = "已取消" if str(e) == "已取消" else "失败"
+                    rows.append((rel_path, status, 0.0, str(e)))
+            self.progress_updated.emit(100 * done // total)
+            if self.is_cancelled and not cancelling:
+                cancelling = True
+                for pending in futures:
+                    pending.cancel()
+        return rows
+
+    def run_text(self, files):
+        # 任务函数来自不依赖 Qt 的 subtitles 模块；spawn 方式（macOS/Windows）下子进程仍会以
+        # __mp_main__ 重新导入本文件，但 __main__ 保护使其不会创建窗口
+        with ProcessPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+            futures = {pool.submit(srt_file_to_text, os.path.join(self.input_dir, rel), self.output_path_for(rel)): rel
+                       for rel in files}
+            return self.collect_results(futures, len(files))
+
+    def run_translate(self, files):
+        def translate_one(rel_path):
+            if self.is_cancelled:
+                raise RuntimeError("已取消")
+            start = time.perf_counter()
+            output_path = self.output_path_for(rel_path)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            translator = SRTTranslator(os.path.join(self.input_dir, rel_path), output_path,
+                                       self.target_language, self.max_workers,
+                                       is_cancelled=lambda: self.is_cancelled)
+            ok, message = translator.translate()
+            if not ok:
+                raise RuntimeError(message)
+            self.log_updated.emit(f"完成: {rel_path}")
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=self.FILE_WORKERS) as pool:
+            futures = {pool.submit(translate_one, rel): rel for rel in files}
+            return self.collect_results(futures, len(files))
+
+    def write_report(self, rows, total_seconds):
+        """写出 summary.csv：每个文件的状态和耗时，末行为合计"""
+        report_path = os.path.join(self.output_dir, "summary.csv")
+        rows = sorted(rows)
+        succeeded = [row for row in rows if row[1] == "成功"]
+        with open(report_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(["文件", "状态", "耗时(秒)", "说明"])
+            for rel_path, status, seconds, message in rows:
+                writer.writerow([rel_path, status, f"{seconds:.3f}", message])
+            writer.writerow([f"合计 {len(rows)} 个，成功 {len(succeeded)} 个", "",
+                             f"{total_seconds:.3f}", f"单文件平均 {sum(r[2] for r in succeeded) / max(1, len(succeeded)):.3f} 秒"])
+        self.log_updated.emit(f"批量处理用时 {total_seconds:.1f} 秒，成功 {len(succeeded)}/{len(rows)}")
+        return report_path
+
+TTS_PCM_SAMPLE_RATE = 44100  # pcm 输出显式指定采样率（16 位单声道），便于计算时长和拼接
+TTS_STREAM_CHUNK = 64 * 1024
+TTS_PLAYBACK_CHUNK = 4096  # 边下载边播放时每次读取的字节数，读满才返回，太大会推迟首次出声
+TTS_WRITE_BUFFER = 1024 ** 2  # 写文件缓冲，网络小块读取不会变成大量小块写盘
+TTS_CACHE_MAX_BYTES = 1024 ** 3
+TTS_CACHE_EVICT_EVERY = 50  # 每写入这么多条缓存才扫描一次目录，批量合成时不必每条都遍历
+
+_tts_cache_writes = 0
+_tts_cache_lock = threading.Lock()
+_tts_evict_lock = threading.Lock()
+
+def evict_tts_cache(force=False):
+    """按需淘汰语音缓存：每 TTS_CACHE_EVICT_EVERY 次写入或 force 时执行，同一时间只有一个线程扫描"""
+    global _tts_cache_writes
+    with _tts_cache_lock:
+        if not force and _tts_cache_writes < TTS_CACHE_EVICT_EVERY:
+            return
+        _tts_cache_writes = 0
+    if _tts_evict_lock.acquire(blocking=False):
+        try:
+            evict_directory_lru(get_cache_dir("tts"), TTS_CACHE_MAX_BYTES)
+        finally:
+            _tts_evict_lock.release()
+
+def tts_cache_path(request_data):
+    """合成结果缓存路径，键为请求参数（模型、音色、文本、格式、采样率）的哈希"""
+    key = hashlib.sha256(json.dumps(request_data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return os.path.join(get_cache_dir("tts"), f"{key}.{request_data['response_format']}")
+
+def synthesize_speech(model, voice, text, fmt, output_path, api_key=None, is_cancelled=None, use_cache=True,
+                      on_data=None, chunk_size=TTS_STREAM_CHUNK):
+    """调用语音合成接口，响应边下载边写入磁盘，返回 (输出路径, 是否来自缓存)
+
+    相同参数的结果缓存在 cache/tts，命中时直接复制；use_cache=False 时跳过读取缓存
+    （仍用新结果刷新缓存）。先写入 .part，完整后再改名，失败或取消时不会留下残缺的音频文件。
+    on_data 不为空时，每收到一块数据（命中缓存时为缓存文件内容）都会回调，用于边下载边播放。
+    """
+    data = {"model": model, "input": text, "voice": voice, "response_format": fmt}
+    if fmt == "pcm":
+        data["sample_rate"] = TTS_PCM_SAMPLE_RATE
+    cached = tts_cache_path(data)
+    if use_cache and os.path.exists(cached):
+        try:
+            os.utime(cached)  # 续期，避免被 LRU 淘汰
+            with atomic_write_path(output_path) as part_path:
+                shutil.copyfile(cached, part_path)
+            hit = True
+        except FileNotFoundError:
+            hit = False  # 刚被其他线程淘汰，按未命中处理
+        if hit:
+            if on_data:
+                with open(output_path, "rb") as f:
+                    for block in iter(lambda: f.read(TTS_STREAM_CHUNK), b""):
+                        on_data(block)
+            return output_path, True
+
+    with atomic_write_path(output_path) as part_path:
+        with get_siliconflow_client().post("audio/speech", api_key=api_key, json=data, stream=True) as resp:
+            if resp.status_code != 200:
+                raise RuntimeError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+            with open(part_path, "wb", buffering=TTS_WRITE_BUFFER) as f:
+                for chunk in resp.iter_content(chunk_size=chunk_size):
+                    if is_cancelled and is_cancelled():
+                        raise RuntimeError("已取消")
+                    f.write(chunk)
+                    if on_data:
+                        on_data(chunk)
+
+    with atomic_write_path(cached) as tmp_path:
+        shutil.copyfile(output_path, tmp_path)
+    global _tts_cache_writes
+    with _tts_cache_lock:
+        _tts_cache_writes += 1
+    evict_tts_cache()
+    return output_path, False
+
+class AudioStreamPlayer:
+    """ffplay 流式播放器：音频数据写入 stdin，收到首批数据即开始播放
+
+    显式指定输入格式并关闭探测，避免 ffplay 攒够数据才开始解码。写 stdin 会随播放进度阻塞，
+    所以 feed 只把数据放入队列，由独立的送数线程写入，下载和后续分段请求按网速进行，
+    后续分段的首字节延迟被已缓冲的音频掩盖。wav 按原始 PCM 播放：每段都跳过文件头，
+    采样率和声道数取自第一段的 fmt 块，多段依次送入时不会把后续文件头当作采样。
+    """
+
+    FORMATS = {"mp3": "mp3", "opus": "ogg", "wav": "s16le", "pcm": "s16le"}
+    CHANNEL_LAYOUTS = {1: "mono", 2: "stereo"}
+
+    def __init__(self, fmt, worker=None):
+        self.fmt = fmt
+        self.worker = worker
+        self.proc = None
+        self.sample_rate = TTS_PCM_SAMPLE_RATE
+        self.channels = 1
+        self.header = b""
+        self.in_header = False
+        self.broken = False
+        self.buffer = queue.Queue()
+        self.feeder = None
+
+    def begin_part(self):
+        """开始送入新的一段（wav 需要重新跳过文件头）"""
+        self.in_header = self.fmt == "wav"
+        self.header = b""
+
+    def feed(self, data):
+        """放入播放队列，不阻塞调用方"""
+        if self.broken:
+            return
+        if self.in_header:
+            self.header += data
+            pos = self.header.find(b"data")
+            if pos < 0 or len(self.header) < pos + 8:
+                return
+            fmt_pos = self.header.find(b"fmt ")
+            if self.proc is None and 0 <= fmt_pos < pos:
+                self.channels = int.from_bytes(self.header[fmt_pos + 10:fmt_pos + 12], "little")
+                self.sample_rate = int.from_bytes(self.header[fmt_pos + 12:fmt_pos + 16], "little")
+            data = self.header[pos + 8:]
+            self.in_header = False
+            self.header = b""
+        if self.proc is None:
+            self.start()
+        if data:
+            self.buffer.put(data)
+
+    def start(self):
+        cmd = ["ffplay", "-nodisp", "-autoexit", "-loglevel", "error", "-fflags", "nobuffer",
+               "-probesize", "32", "-analyzeduration", "0", "-f", self.FORMATS[self.fmt]]
+        if self.FORMATS[self.fmt] == "s16le":
+            cmd += ["-sample_rate", str(self.sample_rate),
+                    "-ch_layout", self.CHANNEL_LAYOUTS.get(self.channels, f"{self.channels}c")]
+        self.proc = subprocess.Popen(cmd + ["-i", "pipe:0"], stdin=subprocess.PIPE, bufsize=0,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if self.worker is not None:
+            self.worker.processes.add(self.proc)  # 取消任务时一并停止播放
+        self.feeder = threading.Thread(target=self._feed_loop, daemon=True)
+        self.feeder.start()
+
+    def _feed_loop(self):
+        while True:
+            data = self.buffer.get()
+            if data is None:
+                break
+            try:
+                self.proc.stdin.write(data)
+            except (BrokenPipeError, OSError):
+                self.broken = True  # 播放窗口被关闭或任务取消时不影响下载
+                return
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+
+    def close(self):
+        """数据送完后结束输入：队列中剩余数据写完后关闭 stdin，ffplay 播完自行退出"""
+        if self.proc is not None:
+            self.buffer.put(None)
+
+def get_audio_duration(path):
+    """音频时长（秒）：pcm 按采样率换算，其余格式用 ffprobe"""
+    if path.lower().endswith(".pcm"):
+        return os.path.getsize(path) / (TTS_PCM_SAMPLE_RATE * 2)
+    return get_media_duration(path)
+
+class TTSBatchThread(WorkerThread):
+    """批量语音合成线程
+
+    脚本为纯文本（每行一句，使用默认音色）或 CSV（音色, 文本；音色留空时用默认音色）。
+    请求通过全局接口线程池并发发出，本批在途请求不超过 max_workers，总速率由客户端限速；
+    每条音频流式写入 output_dir，文件名包含序号、音色和文本摘要，已存在的输出直接跳过，中断后重跑即可续做；
+    脚本改动后重跑时，未修改的句子直接取自语音缓存。
+    结束后写出 manifest.csv 记录每条的文件、时长和状态。
+    """
+
+    HEADER_NAMES = {"voice", "音色"}
+
+    def __init__(self, script_path, output_dir, model, default_voice, fmt="mp3", max_workers=4, use_cache=True):
+        super().__init__()
+        self.script_path = script_path
+        self.output_dir = output_dir
+        self.model = model
+        self.default_voice = default_voice.strip()
+        self.fmt = fmt
+        self.max_workers = max(1, max_workers)
+        self.use_cache = use_cache
+
+    def load_script(self):
+        """读取脚本，返回 [(音色, 文本), ...]"""
+        encoding = sniff_encoding(self.script_path)
+        with open(self.script_path, "r", encoding=encoding, errors="replace", newline="") as f:
+            if self.script_path.lower().endswith(".csv"):
+                rows = [row for row in csv.reader(f) if any(cell.strip() for cell in row)]
+                if rows and rows[0][0].strip().lower() in self.HEADER_NAMES:
+                    rows = rows[1:]
+                # 文本中未加引号的逗号会被拆成多列，第二列之后全部拼回文本
+                items = [(row[0].strip() if len(row) > 1 else "", (",".join(row[1:]) if len(row) > 1 else row[0]).strip())
+                         for row in rows]
+            else:
+                items = [("", line.strip()) for line in f if line.strip()]
+        return [(voice or self.default_voice, text) for voice, text in items if text]
 
-            payload = {
-                "model": "Qwen/Qwen3-Next-80B-A3B-Instruct",
-                "messages": [{"role": "user", "content": prompt}],
-                "stream": False,
-                "max_tokens": 8192,
-                "response_format": {"type": "text"}
-            }
+    def output_path_for(self, index, voice, text):
+        """文件名带文本摘要，句子改动后重跑会重新合成而不是沿用旧音频"""
+        name = re.sub(r'[\\/:*?"<>|\s]+', "_", voice.split(":")[-1]) or "voice"
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.output_dir, f"{index:04d}-{name}-{digest}.{self.fmt}")
 
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
+    def run(self):
+        try:
+            items = self.load_script()
+            if not items:
+                self.finished.emit(False, "脚本中没有可合成的文本")
+                return
+            missing = [i for i, (voice, _) in enumerate(items, 1) if not voice]
+            if missing:
+                self.finished.emit(False, f"第 {missing[0]} 条未指定音色，请在脚本中填写或设置默认音色")
+                return
+            api_key = SiliconFlowClient.get_api_key()
+            if not api_key:
+                self.finished.emit(False, "未检测到API KEY")
+                return
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.log_updated.emit(f"共 {len(items)} 条，开始批量合成")
+
+            start = time.perf_counter()
+            rows = self.synthesize_all(items, api_key)
+            evict_tts_cache(force=True)
+            manifest_path = self.write_manifest(rows, time.perf_counter() - start)
+
+            failed = sum(1 for row in rows if row[5] != "成功")
+            if self.is_cancelled:
+                self.finished.emit(False, f"已取消，已完成的音频和清单已保存: {manifest_path}")
+            elif failed:
+                self.finished.emit(False, f"{failed}/{len(items)} 条失败，详见清单: {manifest_path}")
+            else:
+                self.progress_updated.emit(100)
+                self.finished.emit(True, manifest_path)
 
-            self.progress_updated.emit(50)
-            resp = requests.post(url, json=payload, headers=headers, timeout=120)
+        except Exception as e:
+            self.finished.emit(False, f"批量合成异常: {str(e)}")
+
+    def synthesize_one(self, index, voice, text, api_key):
+        """合成一条，返回 (输出路径, 时长, 说明)"""
+        output_path = self.output_path_for(index, voice, text)
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            return output_path, get_audio_duration(output_path), "已存在"
+        if self.is_cancelled:
+            raise RuntimeError("已取消")
+        _, from_cache = synthesize_speech(self.model, voice, text, self.fmt, output_path, api_key,
+                                          is_cancelled=lambda: self.is_cancelled, use_cache=self.use_cache)
+        return output_path, get_audio_duration(output_path), "缓存命中" if from_cache else ""
+
+    def synthesize_all(self, items, api_key):
+        """滑动窗口提交到共享接口池，返回 [(序号, 音色, 文本, 文件, 时长, 状态, 说明), ...]"""
+        rows = []
+
+        def on_result(key, result, error):
+            index, voice, text = key
+            if error is None:
+                output_path, duration, note = result
+                rows.append((index, voice, text, output_path, duration, "成功", note))
+            else:
+                status = "已取消" if str(error) == "已取消" else "失败"
+                rows.append((index, voice, text, "", None, status, str(error)[:200]))
+            self.progress_updated.emit(100 * len(rows) // len(items))
+            self.log_updated.emit(f"已完成 {len(rows)}/{len(items)} 条")
+
+        jobs = (((index, voice, text), self.synthesize_one, (index, voice, text, api_key))
+                for index, (voice, text) in enumerate(items, 1))
+        run_in_api_pool(jobs, self.max_workers, on_result, lambda: self.is_cancelled)
+
+        done = {row[0] for row in rows}
+        rows.extend((index, voice, text, "", None, "已取消", "")
+                    for index, (voice, text) in enumerate(items, 1) if index not in done)
+        return rows
+
+    def write_manifest(self, rows, total_seconds):
+        """写出 manifest.csv：每条的音色、文本、文件和时长，末行为合计"""
+        manifest_path = os.path.join(self.output_dir, "manifest.csv")
+        rows = sorted(rows)
+        succeeded = [row for row in rows if row[5] == "成功"]
+        audio_seconds = sum(row[4] or 0 for row in succeeded)
+        cache_hits = sum(1 for row in succeeded if row[6] == "缓存命中")
+        with open(manifest_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(["序号", "音色", "文本", "文件", "时长(秒)", "状态", "说明"])
+            for index, voice, text, path, duration, status, message in rows:
+                writer.writerow([index, voice, text, os.path.basename(path),
+                                 "" if duration is None else f"{duration:.3f}", status, message])
+            writer.writerow([f"合计 {len(rows)} 条，成功 {len(succeeded)} 条", "", "", "",
+                             f"{audio_seconds:.3f}", "", f"用时 {total_seconds:.1f} 秒"])
+        self.log_updated.emit(f"批量合成用时 {total_seconds:.1f} 秒，成功 {len(succeeded)}/{len(rows)}"
+                              f"（缓存命中 {cache_hits}），音频总长 {audio_seconds:.1f} 秒")
+        return manifest_path
+
+TTS_CHUNK_CHARS = 300  # 长文本分段合成时每段的字符上限
+TTS_SENTENCE_SPLIT_RE = re.compile(r"(?<=[。！？!?；;…])(?![。！？!?；;…”’\"'）)])\s*|(?<=\.)\s+|\s*\n\s*")
+TTS_CLAUSE_SPLIT_RE = re.compile(r"(?<=[，,、：:])")
+
+def split_tts_text(text, max_chars=TTS_CHUNK_CHARS):
+    """按句子切分长文本并合并为不超过 max_chars 的段；超长的单句再按逗号切，仍超长时硬切"""
+    pieces = []
+    for sentence in TTS_SENTENCE_SPLIT_RE.split(text.strip()):
+        sentence = sentence.strip()
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for clause in TTS_CLAUSE_SPLIT_RE.split(sentence):
+            clause = clause.strip()  # 逗号后的空格留在下一段开头，拼接时会变成双空格
+            pieces.extend(clause[i:i + max_chars].strip() for i in range(0, len(clause), max_chars))
+
+    chunks, current = [], ""
+    for piece in filter(None, pieces):
+        # 英文句子之间补空格，中文直接相连
+        sep = " " if current and current[-1].isascii() and piece[0].isascii() else ""
+        if current and len(current) + len(sep) + len(piece) > max_chars:
+            chunks.append(current)
+            current, sep = "", ""
+        current += sep + piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+class TTSLongTextThread(WorkerThread):
+    """语音生成线程：长文本按句切段并发合成，再按顺序拼接为一个文件
+
+    mp3/opus 用 ffmpeg concat 流复制拼接；wav 逐段拷贝采样帧，pcm 直接按字节连接，
+    均为采样级精确拼接。短文本只有一段时直接合成到输出路径。各段单独缓存，
+    内容未变的段不再请求接口。play=True 时按顺序逐段请求，边下载边送入 ffplay 播放，
+    并记录从开始请求到首批音频数据到达的耗时。
+    """
+    chunk_progress = pyqtSignal(int, int)  # (已完成段数, 总段数)
+
+    def __init__(self, model, voice, text, fmt, output_path, max_workers=4, max_chars=TTS_CHUNK_CHARS,
+                 use_cache=True, play=False):
+        super().__init__()
+        self.model = model
+        self.voice = voice
+        self.text = text
+        self.fmt = fmt
+        self.output_path = output_path
+        self.max_workers = max(1, max_workers)
+        self.max_chars = max_chars
+        self.use_cache = use_cache
+        self.play = play
+        self.cache_hits = 0
 
-            if resp.status_code == 200:
-                result = resp.json()
-                content = result.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-
-                if content:
-                    with open(self.output_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    self.progress_updated.emit(100)
-                    self.finished.emit(True, self.output_path)
-                else:
-                    self.finished.emit(False, "API未返回有效翻译内容")
+    def run(self):
+        scratch_dir = make_scratch_dir("tts-")
+        try:
+            api_key = SiliconFlowClient.get_api_key()
+            if not api_key:
+                self.finished.emit(False, "未检测到API KEY")
+                return
+            chunks = split_tts_text(self.text, self.max_chars)
+            if not chunks:
+                self.finished.emit(False, "没有可合成的文本")
+                return
+            self.chunk_progress.emit(0, len(chunks))
+            if len(chunks) == 1 and not self.play:
+                _, from_cache = synthesize_speech(self.model, self.voice, chunks[0], self.fmt, self.output_path,
+                                                  api_key, lambda: self.is_cancelled, self.use_cache)
+                if from_cache:
+                    self.log_updated.emit("命中语音缓存，未请求接口")
+                self.chunk_progress.emit(1, 1)
+                self.progress_updated.emit(100)
+                self.finished.emit(True, self.output_path)
+                return
+
+            parts = [os.path.join(scratch_dir, f"chunk_{i:04d}.{self.fmt}") for i in range(len(chunks))]
+            if self.play:
+                error = self.stream_chunks(chunks, parts, api_key)
             else:
-                self.finished.emit(False, f"API请求失败: {resp.text}")
+                self.log_updated.emit(f"文本共 {len(self.text)} 字，分 {len(chunks)} 段并发合成")
+                error = self.synthesize_chunks(chunks, parts, api_key)
+            evict_tts_cache(force=True)
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+                return
+            if error:
+                self.finished.emit(False, error)
+                return
+            if self.cache_hits:
+                self.log_updated.emit(f"语音缓存命中 {self.cache_hits}/{len(chunks)} 段")
 
+            if len(parts) == 1:
+                shutil.move(parts[0], self.output_path)
+            else:
+                self.join_parts(parts)
+            if self.is_cancelled:
+                self.finished.emit(False, "已取消")
+                return
+            self.progress_updated.emit(100)
+            self.finished.emit(True, self.output_path)
         except Exception as e:
-            self.finished.emit(False, f"翻译异常: {str(e)}")
+            self.finished.emit(False, f"语音生成失败: {str(e)}")
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    def synthesize_chunks(self, chunks, parts, api_key):
+        """滑动窗口并发合成各段，返回首个错误信息（全部成功时为空字符串）"""
+        done = 0
+        error = ""
+
+        def on_result(index, result, exc):
+            nonlocal done, error
+            if exc is not None:
+                error = f"第 {index + 1} 段合成失败: {exc}"
+                return True  # 任一段失败后不再提交，其余在途请求也尽快停止
+            _, from_cache = result
+            self.cache_hits += from_cache
+            done += 1
+            self.chunk_progress.emit(done, len(chunks))
+            self.progress_updated.emit(90 * done // len(chunks))
+
+        stop = lambda: self.is_cancelled or bool(error)
+        jobs = ((index, synthesize_speech,
+                 (self.model, self.voice, chunk, self.fmt, part, api_key, stop, self.use_cache))
+                for index, (chunk, part) in enumerate(zip(chunks, parts)))
+        run_in_api_pool(jobs, self.max_workers, on_result, lambda: self.is_cancelled)
+        return error
+
+    def stream_chunks(self, chunks, parts, api_key):
+        """按顺序逐段合成，数据一到就送入播放器，返回错误信息（全部成功时为空字符串）"""
+        player = AudioStreamPlayer(self.fmt, self)
+        start = time.perf_counter()
+        first_audio = []
+
+        def on_data(data):
+            if not first_audio:
+                first_audio.append(time.perf_counter() - start)
+                self.log_updated.emit(f"首批音频 {first_audio[0] * 1000:.0f} ms 后到达，开始播放")
+            player.feed(data)
+
+        try:
+            for index, (chunk, part) in enumerate(zip(chunks, parts)):
+                if self.is_cancelled:
+                    return ""
+                player.begin_part()
+                try:
+                    _, from_cache = synthesize_speech(self.model, self.voice, chunk, self.fmt, part, api_key,
+                                                      lambda: self.is_cancelled, self.use_cache,
+                                                      on_data=on_data, chunk_size=TTS_PLAYBACK_CHUNK)
+                except Exception as e:
+                    return f"第 {index + 1} 段合成失败: {e}"
+                self.cache_hits += from_cache
+                self.chunk_progress.emit(index + 1, len(chunks))
+                self.progress_updated.emit(90 * (index + 1) // len(chunks))
+        finally:
+            player.close()
+        return ""
+
+    def join_parts(self, parts):
+        """按顺序拼接各段到输出路径"""
+        if self.fmt == "pcm":
+            with open(self.output_path, "wb") as out:
+                for part in parts:
+                    with open(part, "rb") as f:
+                        shutil.copyfileobj(f, out)
+            return
+        if self.fmt == "wav":
+            try:
+                self.join_wav(parts)
+                return
+            except (wave.Error, EOFError) as e:
+                # 头部不规范（如流式 wav 的长度占位）时退回 ffmpeg 拼接，PCM 流复制同样不丢采样
+                self.log_updated.emit(f"wav 头部无法直接解析（{e}），改用 ffmpeg 拼接")
+
+        filelist_path = os.path.join(os.path.dirname(parts[0]), "filelist.txt")
+        write_concat_list(filelist_path, parts)
+        cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", filelist_path, "-c", "copy", self.output_path]
+        runner = FFmpegRunner(self, progress_range=(90, 100))
+        runner.run(cmd)
+        if runner.returncode != 0 and not self.is_cancelled:
+            raise RuntimeError(f"拼接音频失败: {runner.error_text}")
+
+    def join_wav(self, parts):
+        with wave.open(parts[0], "rb") as first:
+            params = first.getparams()
+        with wave.open(self.output_path, "wb") as out:
+            out.setparams(params)
+            for part in parts:
+                with wave.open(part, "rb") as src:
+                    if src.getparams()[:3] != params[:3]:
+                        raise wave.Error("各段采样格式不一致")
+                    while True:
+                        frames = src.readframes(65536)
+                        if not frames:
+                            break
+                        out.writeframes(frames)
 
 # 功能页面类
 class BasePage(QWidget):
     """页面基类"""
 
+    BATCH_NAME = "批量处理"  # 批量任务提示中的名称
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.main_window = parent
         self.worker_threads = []
         self.thread_pool = ThreadPoolExecutor(max_workers=4)
+        self.job_runner = None
+        self.job_counter = 0
 
     def show_info(self, title, message):
         """显示信息"""
@@ -363,6 +2956,72 @@ class BasePage(QWidget):
         InfoBar.warning(title=title, content=message, orient=Qt.Horizontal,
                       isClosable=True, position=InfoBarPosition.TOP, duration=4000, parent=self)
 
+    def get_job_runner(self):
+        """本页后台任务队列：任务按提交顺序逐个在工作线程中执行，首次使用时创建"""
+        if self.job_runner is None:
+            self.job_runner = FFmpegJobPool(1, self)
+        return self.job_runner
+
+    def submit_job(self, name, worker, on_finished):
+        """提交后台任务：进度写入本页进度条，日志以提示条显示，结束后回调 on_finished(success, message)"""
+        progress_bar = getattr(self, "progress_bar", None)
+        if progress_bar is not None:
+            worker.progress_updated.connect(progress_bar.setValue)
+        worker.log_updated.connect(lambda msg: self.show_info("处理中", msg))
+        worker.finished.connect(on_finished)
+
+        runner = self.get_job_runner()
+        waiting = len(runner.pending) + len(runner.running)
+        self.job_counter += 1
+        runner.submit(f"{name} #{self.job_counter}", worker)
+        self.worker_threads.append(worker)
+        if waiting:
+            self.show_info("已加入队列", f"{name}：前面还有 {waiting} 个任务")
+        else:
+            self.show_info("开始处理", name)
+
+    def cancel_jobs(self):
+        """取消本页排队和运行中的后台任务"""
+        if self.job_runner is not None and self.job_runner.is_busy():
+            self.job_runner.cancel_all()
+            self.show_warning("已取消", "后台任务已取消")
+
+    # 以下批量方法供使用 self.batch_pool（FFmpegJobPool）的页面共用，
+    # 页面需维护 self.batch_failed，可选提供 self.batch_status_label
+
+    def update_batch_progress(self, completed, total, eta):
+        """显示批量进度：已完成/总数及预计剩余时间"""
+        running = len(self.batch_pool.running)
+        if eta >= 0:
+            minutes, seconds = divmod(int(eta), 60)
+            eta_text = f"{minutes:02d}:{seconds:02d}"
+        else:
+            eta_text = "--:--"
+        self.batch_status_label.setText(
+            f"已完成 {completed}/{total}，运行中 {running}，预计剩余 {eta_text}")
+
+    def cancel_batch(self):
+        """取消批量任务：排队中的不再执行，已完成的结果保留"""
+        if self.batch_pool.is_busy():
+            self.batch_pool.cancel_all()
+            self.show_warning("已取消", f"{self.BATCH_NAME}已取消，已完成的结果已保留")
+
+    def cancel_batch_job(self, job_id):
+        """取消批量中的单个任务：排队中的不再执行，运行中的终止其进程"""
+        if self.batch_pool.cancel_job(job_id):
+            self.show_warning("已取消", f"{job_id} 已取消")
+
+    def on_batch_all_finished(self):
+        if self.batch_failed:
+            self.show_warning("批量完成", f"{self.BATCH_NAME}结束，失败/取消 {self.batch_failed} 个")
+        else:
+            self.show_success("批量完成", f"{self.BATCH_NAME}全部完成")
+        status_label = getattr(self, "batch_status_label", None)
+        if status_label is not None:
+            status_label.setText("")
+        self.progress_bar.setValue(0)
+        self.worker_threads = [w for w in self.worker_threads if w.isRunning()]
+
     def get_file_path(self, title, filter_str):
         """获取文件路径"""
         file_path, _ = QFileDialog.getOpenFileName(self, title, "", filter_str)
@@ -674,6 +3333,7 @@ class VoiceManagerPage(BasePage):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.batch_worker = None
         self.init_ui()
 
     def init_ui(self):
@@ -693,6 +3353,7 @@ class VoiceManagerPage(BasePage):
         self.pivot.addItem(routeKey="file_upload", text="音频文件上传")
         self.pivot.addItem(routeKey="voice_list", text="云端音色列表")
         self.pivot.addItem(routeKey="delete_voice", text="删除云端音色")
+        self.pivot.addItem(routeKey="batch_tts", text="批量生成")
         layout.addWidget(self.pivot)
 
         # 堆叠窗口
@@ -706,11 +3367,26 @@ class VoiceManagerPage(BasePage):
         self.stackedWidget.addWidget(self.create_file_upload_tab())
         self.stackedWidget.addWidget(self.create_voice_list_tab())
         self.stackedWidget.addWidget(self.create_delete_voice_tab())
+        self.stackedWidget.addWidget(self.create_batch_tts_tab())
+
+        # 相同 (模型, 音色, 文本, 格式) 默认复用 cache/tts 中的结果
+        self.bypass_cache_checkbox = CheckBox("跳过语音缓存（强制重新请求接口）")
+        layout.addWidget(self.bypass_cache_checkbox)
+        self.stream_play_checkbox = CheckBox("边下载边播放（逐段按顺序请求，收到首批数据即开始播放）")
+        layout.addWidget(self.stream_play_checkbox)
+
+        # 单条语音生成的进度
+        self.progress_bar = ProgressBar()
+        self.progress_bar.setFixedHeight(20)
+        layout.addWidget(self.progress_bar)
+        self.voice_status_label = BodyLabel("")
+        layout.addWidget(self.voice_status_label)
 
         # 连接信号
         self.pivot.currentItemChanged.connect(
             lambda k: self.stackedWidget.setCurrentIndex(
-                ["user_voice", "system_voice", "base64_upload", "file_upload", "voice_list", "delete_voice"].index(k)
+                ["user_voice", "system_voice", "base64_upload", "file_upload", "voice_list", "delete_voice",
+                 "batch_tts"].index(k)
             )
         )
 
@@ -732,8 +3408,15 @@ class VoiceManagerPage(BasePage):
         row.addWidget(widget)
         return row
 
+    def start_api_request(self, method, endpoint, on_finished, **kwargs):
+        """在后台线程发出接口请求，结束后回调 on_finished(success, 响应文本或错误信息)"""
+        worker = SiliconFlowRequestThread(method, endpoint, **kwargs)
+        worker.finished.connect(on_finished)
+        worker.start()
+        self.worker_threads.append(worker)
+
     def get_api_key(self):
-        key = os.environ.get("SiliconCloud_API_KEY")
+        key = SiliconFlowClient.get_api_key()
         if not key:
             self.show_error("错误", "请设置环境变量 SiliconCloud_API_KEY")
             return None
@@ -854,36 +3537,26 @@ class VoiceManagerPage(BasePage):
         os.makedirs("speech", exist_ok=True)
         output_path = os.path.abspath(f"speech/{name}-{ts}.{fmt}")
 
-        url = "https://api.siliconflow.cn/v1/audio/speech"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": model,
-            "input": text,
-            "voice": voice,
-            "response_format": fmt
-        }
+        # 长文本在线程中按句分段并发合成，再按顺序拼接
+        worker = TTSLongTextThread(model, voice, text, fmt, output_path,
+                                   use_cache=not self.bypass_cache_checkbox.isChecked(),
+                                   play=self.stream_play_checkbox.isChecked())
+        worker.chunk_progress.connect(
+            lambda done, total: self.voice_status_label.setText(f"语音分段 {done}/{total} 已完成"))
+        self.submit_job("生成语音", worker, self.on_voice_finished)
 
-        try:
-            self.show_info("处理中", "正在生成语音...")
-            response = requests.post(url, headers=headers, json=data, stream=True)
-            if response.status_code == 200:
-                with open(output_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=1024):
-                        if chunk: f.write(chunk)
-                
-                self.show_success("成功", f"语音生成完成: {output_path}")
-                # 尝试打开文件夹
-                if sys.platform == "darwin":
-                    subprocess.run(["open", os.path.dirname(output_path)])
-                elif sys.platform == "win32":
-                    os.startfile(os.path.dirname(output_path))
-            else:
-                self.show_error("生成失败", response.text)
-        except Exception as e:
-            self.show_error("异常", str(e))
+    def on_voice_finished(self, success, message):
+        self.progress_bar.setValue(0)
+        self.voice_status_label.setText("")
+        if not success:
+            self.show_error("生成失败", message)
+            return
+        self.show_success("成功", f"语音生成完成: {message}")
+        # 尝试打开文件夹
+        if sys.platform == "darwin":
+            subprocess.run(["open", os.path.dirname(message)])
+        elif sys.platform == "win32":
+            os.startfile(os.path.dirname(message))
 
     # --- 3. Base64上传 ---
     def create_base64_upload_tab(self):
@@ -923,27 +3596,24 @@ class VoiceManagerPage(BasePage):
         api_key = self.get_api_key()
         if not api_key: return
 
-        url = "https://api.siliconflow.cn/v1/uploads/audio/voice"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
         data = {
             "model": self.b64_model.currentText(),
             "customName": self.b64_name.text(),
             "audio": self.b64_data.toPlainText().strip(),
             "text": self.b64_text.text()
         }
+        self.show_info("上传中", "正在上传音色...")
+        self.start_api_request("POST", "uploads/audio/voice", self.on_upload_finished, api_key=api_key, json=data)
 
+    def on_upload_finished(self, success, message):
+        if not success:
+            self.show_error("失败", message)
+            return
         try:
-            self.show_info("上传中", "正在上传音色...")
-            resp = requests.post(url, headers=headers, json=data)
-            if resp.status_code == 200:
-                self.show_success("成功", f"上传成功: {resp.json().get('uri', '未知URI')}")
-            else:
-                self.show_error("失败", resp.text)
-        except Exception as e:
-            self.show_error("异常", str(e))
+            uri = json.loads(message).get("uri", "未知URI")
+        except ValueError:
+            uri = "未知URI"
+        self.show_success("成功", f"上传成功: {uri}")
 
     # --- 4. 文件上传 ---
     def create_file_upload_tab(self):
@@ -992,26 +3662,21 @@ class VoiceManagerPage(BasePage):
             self.show_error("错误", "文件不存在")
             return
 
-        url = "https://api.siliconflow.cn/v1/uploads/audio/voice"
-        headers = {"Authorization": f"Bearer {api_key}"}
-
         try:
-            self.show_info("上传中", "正在上传文件...")
+            # 读成 bytes 上传，连接超时重试时可以重新发送
             with open(file_path, "rb") as f:
-                files = {"file": f}
-                data = {
-                    "model": self.fu_model.currentText(),
-                    "customName": self.fu_name.text(),
-                    "text": self.fu_text.toPlainText().strip()
-                }
-                resp = requests.post(url, headers=headers, files=files, data=data)
-
-            if resp.status_code == 200:
-                self.show_success("成功", f"上传成功: {resp.json().get('uri', '未知URI')}")
-            else:
-                self.show_error("失败", resp.text)
-        except Exception as e:
+                files = {"file": (os.path.basename(file_path), f.read())}
+        except OSError as e:
             self.show_error("异常", str(e))
+            return
+        data = {
+            "model": self.fu_model.currentText(),
+            "customName": self.fu_name.text(),
+            "text": self.fu_text.toPlainText().strip()
+        }
+        self.show_info("上传中", "正在上传文件...")
+        self.start_api_request("POST", "uploads/audio/voice", self.on_upload_finished,
+                               api_key=api_key, files=files, data=data)
 
     # --- 5. 云端音色列表 ---
     def create_voice_list_tab(self):
@@ -1038,25 +3703,25 @@ class VoiceManagerPage(BasePage):
         api_key = self.get_api_key()
         if not api_key: return
 
-        url = "https://api.siliconflow.cn/v1/audio/voice/list"
-        headers = {"Authorization": f"Bearer {api_key}"}
+        self.show_info("加载中", "正在获取音色列表...")
+        self.start_api_request("GET", "audio/voice/list", self.on_voice_list_loaded, api_key=api_key)
 
+    def on_voice_list_loaded(self, success, message):
+        if not success:
+            self.show_error("失败", message)
+            return
         try:
-            self.show_info("加载中", "正在获取音色列表...")
-            resp = requests.get(url, headers=headers)
-            if resp.status_code == 200:
-                data = resp.json().get("result", [])
-                self.voice_table.setRowCount(len(data))
-                for i, item in enumerate(data):
-                    self.voice_table.setItem(i, 0, QTableWidgetItem(item.get("customName", "")))
-                    self.voice_table.setItem(i, 1, QTableWidgetItem(item.get("model", "")))
-                    self.voice_table.setItem(i, 2, QTableWidgetItem(item.get("uri", "")))
-                    self.voice_table.setItem(i, 3, QTableWidgetItem(item.get("text", "")))
-                self.show_success("成功", f"加载了 {len(data)} 个音色")
-            else:
-                self.show_error("失败", resp.text)
-        except Exception as e:
-            self.show_error("异常", str(e))
+            data = json.loads(message).get("result", [])
+        except ValueError:
+            self.show_error("失败", f"无法解析音色列表: {message[:200]}")
+            return
+        self.voice_table.setRowCount(len(data))
+        for i, item in enumerate(data):
+            self.voice_table.setItem(i, 0, QTableWidgetItem(item.get("customName", "")))
+            self.voice_table.setItem(i, 1, QTableWidgetItem(item.get("model", "")))
+            self.voice_table.setItem(i, 2, QTableWidgetItem(item.get("uri", "")))
+            self.voice_table.setItem(i, 3, QTableWidgetItem(item.get("text", "")))
+        self.show_success("成功", f"加载了 {len(data)} 个音色")
 
     def copy_uri_from_table(self, item):
         row = item.row()
@@ -1090,25 +3755,135 @@ class VoiceManagerPage(BasePage):
         uri = self.del_uri.text().strip()
         if not uri: return
 
-        url = "https://api.siliconflow.cn/v1/audio/voice/deletions"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
         reply = QMessageBox.question(self, "确认删除", f"确定要删除音色 {uri} 吗？", 
                                    QMessageBox.Yes | QMessageBox.No)
         if reply != QMessageBox.Yes: return
 
-        try:
-            resp = requests.post(url, headers=headers, json={"uri": uri})
-            if resp.status_code == 200:
-                self.show_success("成功", "删除成功")
-                self.del_uri.clear()
-            else:
-                self.show_error("失败", resp.text)
-        except Exception as e:
-            self.show_error("异常", str(e))
+        self.start_api_request("POST", "audio/voice/deletions", self.on_delete_finished,
+                               api_key=api_key, json={"uri": uri})
+
+    def on_delete_finished(self, success, message):
+        if success:
+            self.show_success("成功", "删除成功")
+            self.del_uri.clear()
+        else:
+            self.show_error("失败", message)
+
+    # --- 7. 批量生成 ---
+    def create_batch_tts_tab(self):
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setContentsMargins(0, 20, 0, 0)
+        layout.setSpacing(15)
+
+        self.bt_model = ComboBox()
+        model_options = ["FunAudioLLM/CosyVoice2-0.5B", "IndexTeam/IndexTTS-2", "fnlp/MOSS-TTSD-v0.5"]
+        self.bt_model.addItems(model_options)
+        self.bt_model.setCurrentText("FunAudioLLM/CosyVoice2-0.5B")
+        layout.addLayout(self.create_form_row("模型名称:", self.bt_model))
+
+        self.bt_voice = LineEdit()
+        self.bt_voice.setPlaceholderText("默认音色URI，脚本中未指定音色的行使用")
+        layout.addLayout(self.create_form_row("默认音色:", self.bt_voice))
+
+        script_layout = QHBoxLayout()
+        script_label = BodyLabel("脚本文件:")
+        script_label.setFixedWidth(100)
+        script_layout.addWidget(script_label)
+        self.bt_script = LineEdit()
+        self.bt_script.setPlaceholderText("每行一句的 TXT，或“音色,文本”两列的 CSV")
+        script_layout.addWidget(self.bt_script)
+        script_btn = PushButton("浏览")
+        script_btn.clicked.connect(lambda: self.bt_script.setText(
+            self.get_file_path("选择脚本", "脚本 (*.txt *.csv);;所有文件 (*)")))
+        script_layout.addWidget(script_btn)
+        layout.addLayout(script_layout)
+
+        output_layout = QHBoxLayout()
+        output_label = BodyLabel("输出文件夹:")
+        output_label.setFixedWidth(100)
+        output_layout.addWidget(output_label)
+        self.bt_output = LineEdit()
+        self.bt_output.setPlaceholderText("留空则输出到 speech/batch-时间戳")
+        output_layout.addWidget(self.bt_output)
+        output_btn = PushButton("浏览")
+        output_btn.clicked.connect(lambda: self.bt_output.setText(self.get_folder_path("选择输出文件夹")))
+        output_layout.addWidget(output_btn)
+        layout.addLayout(output_layout)
+
+        option_layout = QHBoxLayout()
+        option_layout.addWidget(BodyLabel("输出格式:"))
+        self.bt_format = ComboBox()
+        self.bt_format.addItems(["mp3", "wav", "opus", "pcm"])
+        self.bt_format.setFixedWidth(150)
+        option_layout.addWidget(self.bt_format)
+        option_layout.addWidget(BodyLabel("并发请求数:"))
+        self.bt_workers = SpinBox()
+        self.bt_workers.setRange(1, API_POOL_WORKERS)
+        self.bt_workers.setValue(4)
+        option_layout.addWidget(self.bt_workers)
+        option_layout.addStretch()
+        layout.addLayout(option_layout)
+
+        btn_layout = QHBoxLayout()
+        start_btn = PrimaryPushButton("开始批量生成")
+        start_btn.setFixedWidth(200)
+        start_btn.clicked.connect(self.start_batch_tts)
+        btn_layout.addWidget(start_btn)
+        cancel_btn = PushButton(FluentIcon.CANCEL, "取消批量")
+        cancel_btn.setFixedWidth(120)
+        cancel_btn.clicked.connect(self.cancel_batch_tts)
+        btn_layout.addWidget(cancel_btn)
+        layout.addLayout(btn_layout)
+
+        self.bt_progress = ProgressBar()
+        self.bt_progress.setFixedHeight(20)
+        layout.addWidget(self.bt_progress)
+
+        self.bt_status = BodyLabel("")
+        layout.addWidget(self.bt_status)
+        layout.addStretch()
+        return widget
+
+    def start_batch_tts(self):
+        script_path = self.bt_script.text().strip()
+        if not script_path or not os.path.exists(script_path):
+            self.show_error("错误", "请选择有效的脚本文件")
+            return
+        if not self.get_api_key():
+            return
+        if self.batch_worker is not None and self.batch_worker.isRunning():
+            self.show_warning("提示", "已有批量任务在运行，请等待完成或取消后再试")
+            return
+
+        output_dir = self.bt_output.text().strip()
+        if not output_dir:
+            ts = datetime.now().strftime("%Y%m%d%H%M")
+            output_dir = os.path.abspath(os.path.join("speech", f"batch-{ts}"))
+
+        worker = TTSBatchThread(script_path, output_dir, self.bt_model.currentText(), self.bt_voice.text(),
+                                self.bt_format.currentText(), self.bt_workers.value(),
+                                use_cache=not self.bypass_cache_checkbox.isChecked())
+        worker.progress_updated.connect(self.bt_progress.setValue)
+        worker.log_updated.connect(self.bt_status.setText)
+        worker.finished.connect(self.on_batch_tts_finished)
+        worker.start()
+
+        self.batch_worker = worker
+        self.worker_threads.append(worker)
+        self.show_info("开始批量生成", f"输出目录: {output_dir}")
+
+    def cancel_batch_tts(self):
+        if self.batch_worker is not None and self.batch_worker.isRunning():
+            self.batch_worker.cancel()
+            self.show_warning("已取消", "正在停止批量生成，已完成的音频会保留")
+
+    def on_batch_tts_finished(self, success, message):
+        if success:
+            self.show_success("批量完成", f"输出清单: {message}")
+        else:
+            self.show_error("批量生成未全部完成", message)
+        self.bt_progress.setValue(0)
 
 
 class VideoConvertPage(BasePage):
@@ -1116,6 +3891,13 @@ class VideoConvertPage(BasePage):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.batch_pool = FFmpegJobPool(os.cpu_count() or 4, self)
+        self.batch_pool.progress_updated.connect(lambda v: self.progress_bar.setValue(v))
+        self.batch_pool.batch_progress_updated.connect(self.update_batch_progress)
+        self.batch_pool.job_finished.connect(self.on_batch_conversion_finished)
+        self.batch_pool.all_jobs_finished.connect(self.on_batch_all_finished)
+        self.batch_failed = 0
+        self.batch_probe = None
         self.init_ui()
 
     def init_ui(self):
@@ -1167,6 +3949,22 @@ class VideoConvertPage(BasePage):
         self.batch_folder_btn = batch_folder_btn
         batch_layout.addWidget(batch_folder_btn, 1, 2)
 
+        batch_layout.addWidget(QLabel("并发任务数:"), 2, 0)
+        self.batch_workers_spin = SpinBox()
+        self.batch_workers_spin.setRange(1, 64)
+        self.batch_workers_spin.setValue(os.cpu_count() or 4)
+        self.batch_workers_spin.setFixedHeight(35)
+        self.batch_workers_spin.valueChanged.connect(self.batch_pool.set_max_workers)
+        batch_layout.addWidget(self.batch_workers_spin, 2, 1)
+
+        batch_cancel_btn = PushButton(FluentIcon.CANCEL, "取消批量")
+        batch_cancel_btn.setFixedWidth(80)
+        batch_cancel_btn.clicked.connect(self.cancel_batch)
+        batch_layout.addWidget(batch_cancel_btn, 2, 2)
+
+        self.batch_status_label = BodyLabel("")
+        batch_layout.addWidget(self.batch_status_label, 3, 0, 1, 3)
+
         batch_group.setLayout(batch_layout)
         layout.addWidget(batch_group)
 
@@ -1216,6 +4014,12 @@ class VideoConvertPage(BasePage):
         self.split_count_spin.setFixedHeight(35)
         split_layout.addWidget(self.split_count_spin, 1, 1)
 
+        split_layout.addWidget(QLabel("分割模式:"), 2, 0)
+        self.split_mode_combo = ComboBox()
+        self.split_mode_combo.addItems(["快速分割（关键帧，流复制）", "精确分割（重新编码，并行）"])
+        self.split_mode_combo.setFixedHeight(35)
+        split_layout.addWidget(self.split_mode_combo, 2, 1)
+
         split_btn = PrimaryPushButton(FluentIcon.CUT, "分割视频")
         split_btn.setFixedWidth(150)
         split_btn.clicked.connect(self.split_video)
@@ -1258,6 +4062,11 @@ class VideoConvertPage(BasePage):
         resize_btn.clicked.connect(self.resize_video)
         resize_layout.addWidget(resize_btn, 2, 2)
 
+        job_cancel_btn = PushButton(FluentIcon.CANCEL, "取消分割/转换")
+        job_cancel_btn.setFixedWidth(150)
+        job_cancel_btn.clicked.connect(self.cancel_jobs)
+        resize_layout.addWidget(job_cancel_btn, 3, 2)
+
         resize_group.setLayout(resize_layout)
         layout.addWidget(resize_group)
 
@@ -1309,6 +4118,8 @@ class VideoConvertPage(BasePage):
 
             worker = VideoConversionThread(video_path, output_path, mode)
             worker.progress_updated.connect(self.progress_bar.setValue)
+            worker.stats_updated.connect(
+                lambda fps, speed: self.batch_status_label.setText(f"编码速度: {fps:.1f} fps, {speed:.2f}x"))
             worker.log_updated.connect(lambda msg: self.show_info("处理中", msg))
             worker.finished.connect(self.on_conversion_finished)
             worker.start()
@@ -1322,18 +4133,47 @@ class VideoConvertPage(BasePage):
             self.show_error("错误", "请选择有效的批量处理文件夹")
             return
 
-        video_files = [f for f in os.listdir(folder_path)
-                      if f.lower().endswith(('.mp4', '.mov', '.avi'))]
+        if self.batch_pool.is_busy():
+            self.show_warning("提示", "已有批量任务在运行，请等待完成或取消后再试")
+            return
+
+        if self.batch_probe is not None and self.batch_probe.isRunning():
+            self.show_warning("提示", "正在读取文件夹，请稍候")
+            return
+
+        # 在后台并行探测整个文件夹（文件多时 ffprobe 耗时较长），结果写入探测缓存供各任务复用
+        self.batch_status_label.setText("正在读取文件夹中的视频信息...")
+        self.batch_probe = FolderProbeThread(folder_path, ('.mp4', '.mov', '.avi'))
+        self.batch_probe.finished.connect(
+            lambda ok, msg, probe_thread=self.batch_probe: self.on_batch_probe_finished(probe_thread, ok, msg, mode))
+        self.worker_threads.append(self.batch_probe)
+        self.batch_probe.start()
+
+    def on_batch_probe_finished(self, probe_thread, success, message, mode):
+        """文件夹探测完成后提交批量任务，无法解析的文件直接跳过"""
+        self.batch_status_label.setText("")
+        if not success:
+            self.show_error("错误", message)
+            return
+        if self.batch_pool.is_busy():
+            self.show_warning("提示", "已有批量任务在运行，请等待完成或取消后再试")
+            return
+        folder_path = probe_thread.folder
+        probed = probe_thread.probed
+        video_files = [os.path.basename(path) for path, info in probed.items() if info and info["duration"]]
+        unreadable = len(probed) - len(video_files)
 
         if not video_files:
-            self.show_error("错误", "文件夹中没有找到视频文件")
+            self.show_error("错误", "文件夹中没有找到可读取的视频文件")
             return
 
-        self.show_info("批量处理", f"找到 {len(video_files)} 个视频文件，开始处理...")
+        self.show_info("批量处理", f"找到 {len(video_files)} 个视频文件，开始处理..."
+                       + (f"（跳过 {unreadable} 个无法读取的文件）" if unreadable else ""))
 
         ts = datetime.now().strftime("%Y%m%d%H%M")
-        total_files = len(video_files)
-        completed = 0
+        os.makedirs(os.path.join(os.getcwd(), 'temp'), exist_ok=True)
+        self.batch_failed = 0
+        self.batch_pool.set_max_workers(self.batch_workers_spin.value())
 
         for video_file in video_files:
             video_path = os.path.join(folder_path, video_file)
@@ -1344,28 +4184,26 @@ class VideoConvertPage(BasePage):
             else:
                 output_path = os.path.join(os.getcwd(), 'temp', f"{base_name}-audio-{ts}.wav")
 
+            # 任务按 FIFO 排队，由任务池控制同时运行的 ffmpeg 进程数
             worker = VideoConversionThread(video_path, output_path, mode)
-            worker.progress_updated.connect(lambda v: self.update_batch_progress(v, total_files))
-            worker.log_updated.connect(lambda msg: self.show_info("处理中", msg))
-            worker.finished.connect(self.on_batch_conversion_finished)
-            worker.start()
-
+            self.batch_pool.submit(video_file, worker)
             self.worker_threads.append(worker)
 
-    def update_batch_progress(self, value, total_files):
-        # 简单的批量进度显示逻辑
-        pass
-
     def on_conversion_finished(self, success, message):
         if success:
             self.show_success("完成", f"转换完成: {message}")
         else:
             self.show_error("错误", f"转换失败: {message}")
         self.progress_bar.setValue(0)
+        if not self.batch_pool.is_busy():
+            self.batch_status_label.setText("")
 
-    def on_batch_conversion_finished(self, success, message):
-        # 批量完成逻辑
-        self.on_conversion_finished(success, message)
+    def on_batch_conversion_finished(self, job_id, success, message):
+        # 单个文件完成时只记录失败数，避免大量弹窗
+        if not success:
+            self.batch_failed += 1
+            if message != "已取消":
+                self.show_error("错误", f"{job_id} 转换失败: {message[-200:]}")
 
     def on_scale_mode_changed(self, text):
         """缩放模式变化时的处理"""
@@ -1401,97 +4239,63 @@ class VideoConvertPage(BasePage):
         ts = datetime.now().strftime("%Y%m%d%H%M")
         output_path = os.path.join(temp_dir, f"{base_name}-resized-{ts}.mp4")
 
-        try:
-            # 根据模式构建缩放参数
-            if scale_mode == "按宽度等比例缩放":
-                scale_filter = f"scale={width}:-2"  # -2表示保持宽高比且为偶数
-            elif scale_mode == "按高度等比例缩放":
-                scale_filter = f"scale=-2:{height}"
-            else:  # 自定义宽高
-                scale_filter = f"scale={width}:{height}"
-
-            cmd = [
-                "ffmpeg", "-y", "-i", video_path,
-                "-vf", scale_filter,
-                "-c:v", "libx264", "-preset", "fast", "-crf", "18",
-                "-c:a", "copy",
-                output_path
-            ]
-
-            self.show_info("开始转换", f"正在转换分辨率: {scale_filter}")
-            self.progress_bar.setValue(30)
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
+        # 根据模式构建缩放参数
+        if scale_mode == "按宽度等比例缩放":
+            scale_filter = f"scale={width}:-2"  # -2表示保持宽高比且为偶数
+        elif scale_mode == "按高度等比例缩放":
+            scale_filter = f"scale=-2:{height}"
+        else:  # 自定义宽高
+            scale_filter = f"scale={width}:{height}"
 
-            if os.path.exists(output_path) and os.path.getsize(output_path) > 1024:
-                self.progress_bar.setValue(100)
-                self.show_success("完成", f"分辨率转换完成: {output_path}")
-            else:
-                self.show_error("错误", f"分辨率转换失败: {result.stderr}")
+        worker = VideoResizeThread(video_path, output_path, scale_filter)
+        self.submit_job(f"转换分辨率 {scale_filter}", worker, self.on_resize_finished)
 
-        except Exception as e:
-            self.show_error("错误", f"分辨率转换异常: {str(e)}")
-        finally:
-            self.progress_bar.setValue(0)
+    def on_resize_finished(self, success, message):
+        if success:
+            self.show_success("完成", f"分辨率转换完成: {message}")
+        else:
+            self.show_error("错误", f"分辨率转换失败: {message}")
+        self.progress_bar.setValue(0)
 
     def split_video(self):
         """视频分割功能"""
         video_path = self.video_path_edit.text().strip()
         segment_name = self.segment_name_edit.text().strip() or "segment"
         count = self.split_count_spin.value()
+        mode = "fast" if self.split_mode_combo.currentIndex() == 0 else "exact"
 
         if not video_path or not os.path.exists(video_path):
             self.show_error("错误", "请选择有效的视频文件")
             return
 
-        try:
-            temp_dir = os.path.join(os.getcwd(), 'temp')
-            ts = datetime.now().strftime("%Y%m%d%H%M")
-            seg_dir = os.path.join(temp_dir, f"{segment_name}-{ts}")
-            os.makedirs(seg_dir, exist_ok=True)
-
-            # 获取视频总时长
-            cmd_probe = [
-                "ffprobe", "-v", "error", "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1", video_path
-            ]
-            result = subprocess.run(cmd_probe, capture_output=True, text=True)
-
-            try:
-                duration = float(result.stdout.strip())
-            except ValueError:
-                self.show_error("错误", "无法获取视频时长")
-                return
-
-            seg_len = duration / count
-            self.show_info("开始分割", f"视频总时长: {duration:.2f}秒, 每段: {seg_len:.2f}秒")
-
-            for i in range(count):
-                start = i * seg_len
-                out_path = os.path.join(seg_dir, f"{segment_name}_{i+1}.mp4")
-
-                cmd = [
-                    "ffmpeg", "-y", "-i", video_path,
-                    "-ss", str(start), "-t", str(seg_len),
-                    "-c:v", "libx264", "-c:a", "copy", out_path
-                ]
-
-                subprocess.run(cmd, capture_output=True, text=True)
-                progress = int((i + 1) / count * 100)
-                self.progress_bar.setValue(progress)
+        temp_dir = os.path.join(os.getcwd(), 'temp')
+        ts = datetime.now().strftime("%Y%m%d%H%M")
+        seg_dir = os.path.join(temp_dir, f"{segment_name}-{ts}")
+        os.makedirs(seg_dir, exist_ok=True)
 
-            self.show_success("完成", f"视频分割完成，共{count}个片段: {seg_dir}")
+        worker = VideoSplitThread(video_path, seg_dir, segment_name, count, mode)
+        self.submit_job(f"分割视频 {os.path.basename(video_path)}", worker,
+                        lambda ok, msg: self.on_split_finished(ok, msg, len(worker.segments)))
 
-        except Exception as e:
-            self.show_error("错误", f"视频分割异常: {str(e)}")
-        finally:
-            self.progress_bar.setValue(0)
+    def on_split_finished(self, success, message, count):
+        if success:
+            self.show_success("完成", f"视频分割完成，共{count}个片段: {message}")
+        else:
+            self.show_error("错误", f"视频分割失败: {message}")
+        self.progress_bar.setValue(0)
 
 class ImageToVideoPage(BasePage):
     """图片转视频页面"""
 
+    BATCH_NAME = "批量生成"
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.batch_pool = FFmpegJobPool(os.cpu_count() or 4, self)
+        self.batch_pool.progress_updated.connect(lambda v: self.progress_bar.setValue(v))
+        self.batch_pool.job_finished.connect(self.on_batch_generation_finished)
+        self.batch_pool.all_jobs_finished.connect(self.on_batch_all_finished)
+        self.batch_failed = 0
         self.init_ui()
 
     def init_ui(self):
@@ -1572,6 +4376,10 @@ class ImageToVideoPage(BasePage):
         self.duration_spin.setFixedHeight(35)
         video_layout.addWidget(self.duration_spin, 2, 1)
 
+        self.still_fast_checkbox = CheckBox("静态图快速模式（只合成一帧再编码）")
+        self.still_fast_checkbox.setChecked(True)
+        video_layout.addWidget(self.still_fast_checkbox, 3, 0, 1, 2)
+
         video_group.setLayout(video_layout)
         layout.addWidget(video_group)
 
@@ -1625,13 +4433,14 @@ class ImageToVideoPage(BasePage):
 
             self.generate_single_video(image_path)
 
-    def generate_single_video(self, image_path):
+    def create_video_worker(self, image_path):
+        """根据当前设置创建图片转视频线程，尺寸无效时返回 None"""
         size = self.size_edit.text().strip()
         duration = self.duration_spin.value()
 
         if not re.match(r'\d+x\d+', size):
             self.show_error("错误", "请输入正确的尺寸格式 (如 1920x1080)")
-            return
+            return None
 
         temp_dir = os.path.join(os.getcwd(), 'temp')
         os.makedirs(temp_dir, exist_ok=True)
@@ -1639,7 +4448,14 @@ class ImageToVideoPage(BasePage):
         img_name = os.path.splitext(os.path.basename(image_path))[0]
         output_path = os.path.join(temp_dir, f"{img_name}.mp4")
 
-        worker = ImageToVideoThread(image_path, output_path, size, duration)
+        return ImageToVideoThread(image_path, output_path, size, duration,
+                                  self.still_fast_checkbox.isChecked())
+
+    def generate_single_video(self, image_path):
+        worker = self.create_video_worker(image_path)
+        if worker is None:
+            return
+
         worker.progress_updated.connect(self.progress_bar.setValue)
         worker.log_updated.connect(lambda msg: self.show_info("处理中", msg))
         worker.finished.connect(self.on_generation_finished)
@@ -1661,11 +4477,20 @@ class ImageToVideoPage(BasePage):
             self.show_error("错误", "文件夹中没有找到图片文件")
             return
 
+        if self.batch_pool.is_busy():
+            self.show_warning("提示", "已有批量任务在运行，请等待完成后再试")
+            return
+
         self.show_info("批量处理", f"找到 {len(image_files)} 个图片文件，开始处理...")
+        self.batch_failed = 0
 
+        # 通过任务池排队，避免上千张图片同时启动 ffmpeg
         for image_file in image_files:
-            image_path = os.path.join(folder_path, image_file)
-            self.generate_single_video(image_path)
+            worker = self.create_video_worker(os.path.join(folder_path, image_file))
+            if worker is None:
+                return
+            self.batch_pool.submit(image_file, worker)
+            self.worker_threads.append(worker)
 
     def on_generation_finished(self, success, message):
         if success:
@@ -1674,6 +4499,10 @@ class ImageToVideoPage(BasePage):
             self.show_error("错误", f"视频生成失败: {message}")
         self.progress_bar.setValue(0)
 
+    def on_batch_generation_finished(self, job_id, success, message):
+        if not success:
+            self.batch_failed += 1
+
 class MergeVideoAudioPage(BasePage):
     """合并视频与音频页面"""
 
@@ -1756,9 +4585,17 @@ class MergeVideoAudioPage(BasePage):
         merge_layout.addWidget(QLabel("滤镜类型:"), 3, 0)
         self.filter_combo = ComboBox()
         self.filter_combo.addItems(["scale+zoom", "scale+zoompan", "无"])
+        self.filter_combo.setCurrentText("scale+zoompan")
         self.filter_combo.setEnabled(False)
         merge_layout.addWidget(self.filter_combo, 3, 1)
 
+        merge_layout.addWidget(QLabel("缩放质量:"), 4, 0)
+        self.zoom_preset_combo = ComboBox()
+        self.zoom_preset_combo.addItems(list(ZOOM_PRESETS.keys()))
+        self.zoom_preset_combo.setCurrentText("均衡")
+        self.zoom_preset_combo.setEnabled(False)
+        merge_layout.addWidget(self.zoom_preset_combo, 4, 1)
+
         merge_group.setLayout(merge_layout)
         layout.addWidget(merge_group)
 
@@ -1777,6 +4614,11 @@ class MergeVideoAudioPage(BasePage):
         self.zoom_merge_btn = zoom_merge_btn
         btn_layout.addWidget(zoom_merge_btn)
 
+        cancel_btn = PushButton(FluentIcon.CANCEL, "取消")
+        cancel_btn.setFixedHeight(45)
+        cancel_btn.clicked.connect(self.cancel_jobs)
+        btn_layout.addWidget(cancel_btn)
+
         layout.addLayout(btn_layout)
 
         # 进度条
@@ -1806,30 +4648,9 @@ class MergeVideoAudioPage(BasePage):
         is_checked = state == Qt.Checked
         self.zoom_end_spin.setEnabled(is_checked)
         self.filter_combo.setEnabled(is_checked)
+        self.zoom_preset_combo.setEnabled(is_checked)
         self.zoom_merge_btn.setEnabled(is_checked)
 
-    def get_video_duration(self, video_path):
-        """获取视频时长"""
-        cmd = [
-            "ffprobe", "-v", "error", "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1", video_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        try:
-            return float(result.stdout.strip())
-        except ValueError:
-            return None
-
-    def convert_png_to_jpg(self, png_path, jpg_path):
-        """将PNG转换为JPG（封面需要）"""
-        try:
-            img = Image.open(png_path)
-            rgb_img = img.convert('RGB')
-            rgb_img.save(jpg_path, quality=95)
-            return True
-        except Exception:
-            return False
-
     def merge_videos(self):
         """基础合并功能：合并视频片段并添加音频"""
         video_folder = self.video_folder_edit.text().strip()
@@ -1845,90 +4666,29 @@ class MergeVideoAudioPage(BasePage):
             self.show_error("错误", "请选择有效的音频文件")
             return
 
-        try:
-            temp_dir = os.path.join(os.getcwd(), 'temp')
-            os.makedirs(temp_dir, exist_ok=True)
-            ts = datetime.now().strftime("%Y%m%d%H%M")
-
-            # 获取视频文件列表
-            videos = [f for f in os.listdir(video_folder) if f.lower().endswith('.mp4')]
-            videos.sort()
-
-            if not videos:
-                self.show_error("错误", "视频文件夹中没有找到MP4文件")
-                return
-
-            self.show_info("开始合并", f"找到 {len(videos)} 个视频片段，开始合并...")
-            self.progress_bar.setValue(10)
-
-            # 生成文件列表
-            filelist_path = os.path.join(temp_dir, "filelist.txt")
-            with open(filelist_path, 'w') as f:
-                for v in videos:
-                    f.write(f"file '{os.path.join(video_folder, v)}'\n")
-
-            # 合并视频片段
-            concat_path = os.path.join(temp_dir, f"concat_{ts}.mp4")
-            cmd_concat = [
-                "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", filelist_path,
-                "-c:v", "libx264", "-preset", "fast", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
-                concat_path
-            ]
-            result_concat = subprocess.run(cmd_concat, capture_output=True, text=True)
-
-            if not os.path.isfile(concat_path):
-                self.show_error("错误", f"合并视频片段失败: {result_concat.stderr}")
-                return
-
-            self.progress_bar.setValue(50)
-
-            # 合成音视频
-            out_path = os.path.join(temp_dir, f"{output_name}-{ts}.mp4")
-            cmd_merge = [
-                "ffmpeg", "-y", "-i", concat_path, "-i", audio_path,
-                "-c:v", "libx264", "-preset", "fast", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
-                "-map", "0:v:0", "-map", "1:a:0",
-                "-shortest", out_path
-            ]
-            result_merge = subprocess.run(cmd_merge, capture_output=True, text=True)
-
-            if not os.path.isfile(out_path) or os.path.getsize(out_path) < 1024:
-                self.show_error("错误", f"合成音视频失败: {result_merge.stderr}")
-                return
-
-            self.progress_bar.setValue(80)
-
-            # 添加封面（如果有）
-            if cover_path and os.path.isfile(cover_path):
-                cover_ext = os.path.splitext(cover_path)[1].lower()
-                cover_file_to_use = cover_path
-
-                # PNG转JPG
-                if cover_ext == ".png":
-                    cover_jpg = os.path.join(temp_dir, f"cover_{ts}.jpg")
-                    if self.convert_png_to_jpg(cover_path, cover_jpg):
-                        cover_file_to_use = cover_jpg
+        temp_dir = os.path.join(os.getcwd(), 'temp')
+        os.makedirs(temp_dir, exist_ok=True)
+        ts = datetime.now().strftime("%Y%m%d%H%M")
 
-                out_with_cover = os.path.join(temp_dir, f"{output_name}-{ts}-cover.mp4")
-                cmd_cover = [
-                    "ffmpeg", "-y", "-i", out_path, "-i", cover_file_to_use,
-                    "-map", "0", "-map", "1", "-c", "copy",
-                    "-disposition:v:1", "attached_pic", out_with_cover
-                ]
-                result_cover = subprocess.run(cmd_cover, capture_output=True, text=True)
+        # 获取视频文件列表
+        videos = [f for f in os.listdir(video_folder) if f.lower().endswith('.mp4')]
+        videos.sort()
 
-                if os.path.isfile(out_with_cover) and os.path.getsize(out_with_cover) > 1024:
-                    os.replace(out_with_cover, out_path)
+        if not videos:
+            self.show_error("错误", "视频文件夹中没有找到MP4文件")
+            return
 
-            self.progress_bar.setValue(100)
-            self.show_success("完成", f"视频合成完成: {out_path}")
+        out_path = os.path.join(temp_dir, f"{output_name}-{ts}.mp4")
+        worker = VideoMergeThread([os.path.join(video_folder, v) for v in videos],
+                                  audio_path, out_path, cover_path or None)
+        self.submit_job(f"基础合并 {len(videos)} 个片段", worker, self.on_merge_finished)
 
-        except Exception as e:
-            self.show_error("错误", f"合并异常: {str(e)}")
-        finally:
-            self.progress_bar.setValue(0)
+    def on_merge_finished(self, success, message):
+        if success:
+            self.show_success("完成", f"视频合成完成: {message}")
+        else:
+            self.show_error("错误", message)
+        self.progress_bar.setValue(0)
 
     def merge_with_zoom(self):
         """缩放合并功能：支持缩放滤镜效果"""
@@ -1946,102 +4706,49 @@ class MergeVideoAudioPage(BasePage):
             self.show_error("错误", "请选择有效的音频文件")
             return
 
-        try:
-            temp_dir = os.path.join(os.getcwd(), 'temp')
-            os.makedirs(temp_dir, exist_ok=True)
-            ts = datetime.now().strftime("%Y%m%d%H%M")
-
-            # 获取视频文件列表
-            videos = [f for f in os.listdir(video_folder) if f.lower().endswith('.mp4')]
-            videos.sort()
-
-            if not videos:
-                self.show_error("错误", "视频文件夹中没有找到MP4文件")
-                return
-
-            self.show_info("开始处理", f"找到 {len(videos)} 个视频片段，开始应用滤镜...")
-
-            filtered_list = []
-            zoom_ratio = zoom_end - 1
-
-            for idx, v in enumerate(videos):
-                in_path = os.path.join(video_folder, v)
-                filtered_path = os.path.join(temp_dir, f"filtered_{idx+1}.mp4")
-
-                # 获取视频时长
-                duration = self.get_video_duration(in_path)
-                if not duration or duration <= 0:
-                    self.show_error("错误", f"无法获取视频时长: {in_path}")
-                    return
-
-                if filter_type in ["scale+zoom", "scale+zoompan"]:
-                    # 构造缩放滤镜
-                    vf_str = f"scale=iw*(1+{zoom_ratio}*t/{duration}):ih*(1+{zoom_ratio}*t/{duration}),crop=iw:ih"
-                    cmd = [
-                        "ffmpeg", "-y", "-i", in_path, "-vf", vf_str,
-                        "-c:v", "libx264", "-c:a", "aac", filtered_path
-                    ]
-                else:
-                    # 无滤镜
-                    cmd = [
-                        "ffmpeg", "-y", "-i", in_path,
-                        "-c:v", "libx264", "-c:a", "copy", filtered_path
-                    ]
-
-                subprocess.run(cmd, capture_output=True, text=True)
-
-                if not os.path.isfile(filtered_path):
-                    self.show_error("错误", f"滤镜处理失败: {filtered_path}")
-                    return
-
-                filtered_list.append(filtered_path)
-                progress = int((idx + 1) / len(videos) * 50)
-                self.progress_bar.setValue(progress)
-
-            # 生成文件列表并合并
-            filelist_path = os.path.join(temp_dir, "filelist.txt")
-            with open(filelist_path, "w") as f:
-                for fp in filtered_list:
-                    f.write(f"file '{fp}'\n")
-
-            merged_path = os.path.join(temp_dir, f"{output_name}-{ts}-merged.mp4")
-            cmd_concat = [
-                "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", filelist_path,
-                "-c", "copy", merged_path
-            ]
-            subprocess.run(cmd_concat, capture_output=True, text=True)
-
-            if not os.path.isfile(merged_path):
-                self.show_error("错误", "合并滤镜视频失败")
-                return
-
-            self.progress_bar.setValue(75)
+        temp_dir = os.path.join(os.getcwd(), 'temp')
+        os.makedirs(temp_dir, exist_ok=True)
+        ts = datetime.now().strftime("%Y%m%d%H%M")
 
-            # 合成音视频
-            final_path = os.path.join(temp_dir, f"{output_name}-{ts}-final.mp4")
-            cmd_merge = [
-                "ffmpeg", "-y", "-i", merged_path, "-i", audio_path,
-                "-c:v", "copy", "-c:a", "aac", "-shortest", final_path
-            ]
-            subprocess.run(cmd_merge, capture_output=True, text=True)
+        # 获取视频文件列表
+        videos = [f for f in os.listdir(video_folder) if f.lower().endswith('.mp4')]
+        videos.sort()
 
-            if not os.path.isfile(final_path):
-                self.show_error("错误", "合成音视频失败")
-                return
+        if not videos:
+            self.show_error("错误", "视频文件夹中没有找到MP4文件")
+            return
 
-            self.progress_bar.setValue(100)
-            self.show_success("完成", f"缩放合并完成: {final_path}")
+        final_path = os.path.join(temp_dir, f"{output_name}-{ts}-final.mp4")
+        worker = ZoomMergeThread([os.path.join(video_folder, v) for v in videos],
+                                 audio_path, final_path, zoom_end, filter_type,
+                                 self.zoom_preset_combo.currentText())
+        self.submit_job(f"缩放合并 {len(videos)} 个片段", worker, self.on_zoom_merge_finished)
 
-        except Exception as e:
-            self.show_error("错误", f"缩放合并异常: {str(e)}")
-        finally:
-            self.progress_bar.setValue(0)
+    def on_zoom_merge_finished(self, success, message):
+        if success:
+            self.show_success("完成", f"缩放合并完成: {message}")
+        else:
+            self.show_error("错误", f"缩放合并失败: {message}")
+        self.progress_bar.setValue(0)
 
 class SubtitleGenerationPage(BasePage):
     """字幕生成页面"""
 
+    BATCH_NAME = "批量生成"
+
+    AUDIO_EXTENSIONS = ('.mp3', '.wav', '.aac', '.flac', '.m4a')
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        # 批量识别槽位：每个槽位一个识别任务，CPU 线程按槽位平分
+        self.batch_pool = FFmpegJobPool(2, self)
+        self.batch_pool.progress_updated.connect(lambda v: self.progress_bar.setValue(v))
+        self.batch_pool.batch_progress_updated.connect(self.update_batch_progress)
+        self.batch_pool.job_started.connect(lambda job_id: self.set_batch_status(job_id, "识别中"))
+        self.batch_pool.job_finished.connect(self.on_batch_subtitle_finished)
+        self.batch_pool.all_jobs_finished.connect(self.on_batch_all_finished)
+        self.batch_rows = {}  # job_id -> 表格行号
+        self.batch_failed = 0
         self.init_ui()
 
     def init_ui(self):
@@ -2071,6 +4778,52 @@ class SubtitleGenerationPage(BasePage):
         audio_group.setLayout(audio_layout)
         layout.addWidget(audio_group)
 
+        # 批量处理组
+        batch_group = QGroupBox("批量处理")
+        batch_layout = QGridLayout()
+
+        self.batch_checkbox = CheckBox("启用批量处理")
+        self.batch_checkbox.stateChanged.connect(self.toggle_batch_mode)
+        batch_layout.addWidget(self.batch_checkbox, 0, 0)
+
+        batch_layout.addWidget(QLabel("批量文件夹:"), 1, 0)
+        self.batch_path_edit = LineEdit()
+        self.batch_path_edit.setPlaceholderText("选择包含音频的文件夹...")
+        self.batch_path_edit.setFixedHeight(35)
+        self.batch_path_edit.setEnabled(False)
+        batch_layout.addWidget(self.batch_path_edit, 1, 1)
+
+        self.batch_folder_btn = PushButton(FluentIcon.FOLDER, "选择")
+        self.batch_folder_btn.setFixedWidth(80)
+        self.batch_folder_btn.clicked.connect(self.browse_batch_folder)
+        self.batch_folder_btn.setEnabled(False)
+        batch_layout.addWidget(self.batch_folder_btn, 1, 2)
+
+        batch_layout.addWidget(QLabel("识别槽位数:"), 2, 0)
+        self.batch_slots_spin = SpinBox()
+        self.batch_slots_spin.setRange(1, 16)
+        self.batch_slots_spin.setValue(max(1, min(4, (os.cpu_count() or 4) // 4)))
+        self.batch_slots_spin.setFixedHeight(35)
+        batch_layout.addWidget(self.batch_slots_spin, 2, 1)
+
+        batch_cancel_btn = PushButton(FluentIcon.CANCEL, "取消批量")
+        batch_cancel_btn.setFixedWidth(80)
+        batch_cancel_btn.clicked.connect(self.cancel_batch)
+        batch_layout.addWidget(batch_cancel_btn, 2, 2)
+
+        self.batch_status_label = BodyLabel("")
+        batch_layout.addWidget(self.batch_status_label, 3, 0, 1, 3)
+
+        self.batch_table = TableWidget(self)
+        self.batch_table.setColumnCount(4)
+        self.batch_table.setHorizontalHeaderLabels(["文件", "状态", "输出", "操作"])
+        self.batch_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.batch_table.setMinimumHeight(160)
+        batch_layout.addWidget(self.batch_table, 4, 0, 1, 3)
+
+        batch_group.setLayout(batch_layout)
+        layout.addWidget(batch_group)
+
         # 字幕生成设置
         srt_group = QGroupBox("字幕设置")
         srt_layout = QGridLayout()
@@ -2088,6 +4841,27 @@ class SubtitleGenerationPage(BasePage):
         self.char_count_spin.setFixedHeight(35)
         srt_layout.addWidget(self.char_count_spin, 1, 1)
 
+        srt_layout.addWidget(QLabel("识别后端:"), 2, 0)
+        self.backend_combo = ComboBox()
+        self.backend_combo.addItems(["常驻服务（模型只加载一次）", "单次进程 (whisper-cli)",
+                                     "静音切分并行（长音频）"])
+        self.backend_combo.setFixedHeight(35)
+        self.backend_combo.currentIndexChanged.connect(
+            lambda index: self.parallel_spin.setEnabled(index == 2))
+        srt_layout.addWidget(self.backend_combo, 2, 1)
+
+        srt_layout.addWidget(QLabel("并行段数:"), 3, 0)
+        self.parallel_spin = SpinBox()
+        self.parallel_spin.setRange(2, 16)
+        self.parallel_spin.setValue(max(2, min(8, (os.cpu_count() or 4) // 2)))
+        self.parallel_spin.setFixedHeight(35)
+        self.parallel_spin.setEnabled(False)
+        srt_layout.addWidget(self.parallel_spin, 3, 1)
+
+        self.transcript_cache_checkbox = CheckBox("复用识别缓存（同一音频只改字符数时无需重新识别）")
+        self.transcript_cache_checkbox.setChecked(True)
+        srt_layout.addWidget(self.transcript_cache_checkbox, 4, 0, 1, 2)
+
         srt_group.setLayout(srt_layout)
         layout.addWidget(srt_group)
 
@@ -2110,7 +4884,26 @@ class SubtitleGenerationPage(BasePage):
         if file_path:
             self.audio_path_edit.setText(file_path)
 
+    def toggle_batch_mode(self, state):
+        is_checked = state == Qt.Checked
+        self.audio_path_edit.setEnabled(not is_checked)
+        self.srt_name_edit.setEnabled(not is_checked)
+        self.batch_path_edit.setEnabled(is_checked)
+        self.batch_folder_btn.setEnabled(is_checked)
+
+    def browse_batch_folder(self):
+        folder_path = self.get_folder_path("选择音频文件夹")
+        if folder_path:
+            self.batch_path_edit.setText(folder_path)
+
+    def selected_backend(self):
+        return ["server", "cli", "parallel"][self.backend_combo.currentIndex()]
+
     def generate_subtitle(self):
+        if self.batch_checkbox.isChecked():
+            self.batch_generate()
+            return
+
         audio_path = self.audio_path_edit.text().strip()
         srt_name = self.srt_name_edit.text().strip() or "subtitle"
         char_count = self.char_count_spin.value()
@@ -2125,7 +4918,9 @@ class SubtitleGenerationPage(BasePage):
         ts = datetime.now().strftime("%Y%m%d%H%M")
         output_path = os.path.join(srt_dir, f"{srt_name}-{ts}.srt")
 
-        worker = SRTGenerationThread(audio_path, output_path, char_count)
+        worker = SRTGenerationThread(audio_path, output_path, char_count, self.selected_backend(),
+                                     self.parallel_spin.value(),
+                                     use_cache=self.transcript_cache_checkbox.isChecked())
         worker.progress_updated.connect(self.progress_bar.setValue)
         worker.log_updated.connect(lambda msg: self.show_info("处理中", msg))
         worker.finished.connect(self.on_subtitle_finished)
@@ -2141,11 +4936,99 @@ class SubtitleGenerationPage(BasePage):
             self.show_error("错误", f"字幕生成失败: {message}")
         self.progress_bar.setValue(0)
 
+    def batch_generate(self):
+        folder_path = self.batch_path_edit.text().strip()
+        if not folder_path or not os.path.isdir(folder_path):
+            self.show_error("错误", "请选择有效的批量处理文件夹")
+            return
+
+        audio_files = sorted(f for f in os.listdir(folder_path)
+                             if f.lower().endswith(self.AUDIO_EXTENSIONS))
+        if not audio_files:
+            self.show_error("错误", "文件夹中没有找到音频文件")
+            return
+
+        if self.batch_pool.is_busy():
+            self.show_warning("提示", "已有批量任务在运行，请等待完成或取消后再试")
+            return
+
+        srt_dir = os.path.join(os.getcwd(), 'SRT')
+        os.makedirs(srt_dir, exist_ok=True)
+        ts = datetime.now().strftime("%Y%m%d%H%M")
+
+        slots = self.batch_slots_spin.value()
+        threads = max(1, (os.cpu_count() or 4) // slots)
+        backend = self.selected_backend()
+        self.batch_pool.set_max_workers(slots)
+        self.batch_failed = 0
+        self.batch_rows = {}
+        self.batch_table.setRowCount(len(audio_files))
+
+        self.show_info("批量生成", f"找到 {len(audio_files)} 个音频文件，{slots} 个槽位 × {threads} 线程")
+
+        for row, audio_file in enumerate(audio_files):
+            self.batch_rows[audio_file] = row
+            self.batch_table.setItem(row, 0, QTableWidgetItem(audio_file))
+            self.batch_table.setItem(row, 1, QTableWidgetItem("排队中"))
+            self.batch_table.setItem(row, 2, QTableWidgetItem(""))
+            cancel_btn = PushButton("取消")
+            cancel_btn.clicked.connect(lambda _=False, jid=audio_file: self.cancel_batch_job(jid))
+            self.batch_table.setCellWidget(row, 3, cancel_btn)
+
+            base_name = os.path.splitext(audio_file)[0]
+            output_path = os.path.join(srt_dir, f"{base_name}-{ts}.srt")
+            worker = SRTGenerationThread(os.path.join(folder_path, audio_file), output_path,
+                                         self.char_count_spin.value(), backend,
+                                         self.parallel_spin.value(),
+                                         use_cache=self.transcript_cache_checkbox.isChecked(),
+                                         threads=threads)
+            worker.log_updated.connect(lambda msg, jid=audio_file: self.set_batch_status(jid, msg))
+            # 每个文件完成即写出字幕，取消批量时已完成的结果保留
+            self.batch_pool.submit(audio_file, worker)
+            self.worker_threads.append(worker)
+
+    def set_batch_status(self, job_id, status, output=None):
+        row = self.batch_rows.get(job_id)
+        if row is None:
+            return
+        self.batch_table.setItem(row, 1, QTableWidgetItem(status))
+        if output is not None:
+            self.batch_table.setItem(row, 2, QTableWidgetItem(output))
+
+    def on_batch_subtitle_finished(self, job_id, success, message):
+        row = self.batch_rows.get(job_id)
+        cancel_btn = self.batch_table.cellWidget(row, 3) if row is not None else None
+        if cancel_btn is not None:
+            cancel_btn.setEnabled(False)
+        if success:
+            self.set_batch_status(job_id, "✅ 完成", os.path.basename(message))
+        else:
+            self.batch_failed += 1
+            self.set_batch_status(job_id, "已取消" if message == "已取消" else f"❌ {message[-200:]}")
+
 class SubtitleTextPage(BasePage):
     """字幕转文本页面"""
 
+    # 语言映射
+    LANGUAGE_MAP = {
+        "英文": "English",
+        "中文": "Chinese",
+        "繁体中文": "Traditional Chinese",
+        "韩语": "Korean",
+        "日语": "Japanese",
+        "俄语": "Russian",
+        "德语": "German",
+        "法语": "French",
+        "阿拉伯语": "Arabic",
+        "越南语": "Vietnamese",
+        "印地语": "Hindi",
+        "西班牙语": "Spanish",
+        "葡萄牙语": "Portuguese"
+    }
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.batch_worker = None
         self.init_ui()
 
     def init_ui(self):
@@ -2220,9 +5103,62 @@ class SubtitleTextPage(BasePage):
         translate_btn.clicked.connect(self.translate_srt_file)
         translate_layout.addWidget(translate_btn, 1, 2)
 
+        translate_layout.addWidget(QLabel("并发请求数:"), 2, 0)
+        self.translate_workers_spin = SpinBox()
+        self.translate_workers_spin.setRange(1, 16)
+        self.translate_workers_spin.setValue(4)
+        self.translate_workers_spin.setFixedHeight(35)
+        translate_layout.addWidget(self.translate_workers_spin, 2, 1)
+
         translate_group.setLayout(translate_layout)
         layout.addWidget(translate_group)
 
+        # 文件夹批量处理组
+        batch_group = QGroupBox("文件夹批量处理")
+        batch_layout = QGridLayout()
+
+        batch_layout.addWidget(QLabel("SRT文件夹:"), 0, 0)
+        self.batch_input_edit = LineEdit()
+        self.batch_input_edit.setPlaceholderText("选择包含SRT的文件夹（含子文件夹）...")
+        self.batch_input_edit.setFixedHeight(35)
+        batch_layout.addWidget(self.batch_input_edit, 0, 1)
+
+        batch_input_btn = PushButton(FluentIcon.FOLDER, "选择")
+        batch_input_btn.setFixedWidth(80)
+        batch_input_btn.clicked.connect(lambda: self.browse_batch_folder(self.batch_input_edit))
+        batch_layout.addWidget(batch_input_btn, 0, 2)
+
+        batch_layout.addWidget(QLabel("输出文件夹:"), 1, 0)
+        self.batch_output_edit = LineEdit()
+        self.batch_output_edit.setPlaceholderText("留空则输出到 SRT/batch-时间戳，目录结构与输入一致")
+        self.batch_output_edit.setFixedHeight(35)
+        batch_layout.addWidget(self.batch_output_edit, 1, 1)
+
+        batch_output_btn = PushButton(FluentIcon.FOLDER, "选择")
+        batch_output_btn.setFixedWidth(80)
+        batch_output_btn.clicked.connect(lambda: self.browse_batch_folder(self.batch_output_edit))
+        batch_layout.addWidget(batch_output_btn, 1, 2)
+
+        batch_btn_layout = QHBoxLayout()
+        batch_text_btn = PrimaryPushButton(FluentIcon.DOWNLOAD, "批量转文本")
+        batch_text_btn.clicked.connect(lambda: self.start_batch("text"))
+        batch_btn_layout.addWidget(batch_text_btn)
+
+        batch_translate_btn = PrimaryPushButton(FluentIcon.LANGUAGE, "批量翻译")
+        batch_translate_btn.clicked.connect(lambda: self.start_batch("translate"))
+        batch_btn_layout.addWidget(batch_translate_btn)
+
+        batch_cancel_btn = PushButton(FluentIcon.CANCEL, "取消批量")
+        batch_cancel_btn.clicked.connect(self.cancel_batch)
+        batch_btn_layout.addWidget(batch_cancel_btn)
+        batch_layout.addLayout(batch_btn_layout, 2, 0, 1, 3)
+
+        self.batch_status_label = BodyLabel("")
+        batch_layout.addWidget(self.batch_status_label, 3, 0, 1, 3)
+
+        batch_group.setLayout(batch_layout)
+        layout.addWidget(batch_group)
+
         # 进度条
         self.progress_bar = ProgressBar()
         self.progress_bar.setFixedHeight(20)
@@ -2270,27 +5206,11 @@ class SubtitleTextPage(BasePage):
         srt_dir = os.path.join(os.getcwd(), 'SRT')
         os.makedirs(srt_dir, exist_ok=True)
 
-        # 语言映射
-        lang_map = {
-            "英文": "English",
-            "中文": "Chinese",
-            "繁体中文": "Traditional Chinese",
-            "韩语": "Korean",
-            "日语": "Japanese",
-            "俄语": "Russian",
-            "德语": "German",
-            "法语": "French",
-            "阿拉伯语": "Arabic",
-            "越南语": "Vietnamese",
-            "印地语": "Hindi",
-            "西班牙语": "Spanish",
-            "葡萄牙语": "Portuguese"
-        }
-
-        target_lang = lang_map.get(target_language, "English")
+        target_lang = self.LANGUAGE_MAP.get(target_language, "English")
         output_path = os.path.join(srt_dir, f"{output_name}-{target_lang}.srt")
 
-        worker = SRTTranslateThread(srt_path, output_path, target_lang)
+        worker = SRTTranslateThread(srt_path, output_path, target_lang,
+                                    self.translate_workers_spin.value())
         worker.progress_updated.connect(self.progress_bar.setValue)
         worker.log_updated.connect(lambda msg: self.show_info("处理中", msg))
         worker.finished.connect(self.on_translate_finished)
@@ -2299,6 +5219,49 @@ class SubtitleTextPage(BasePage):
         self.worker_threads.append(worker)
         self.show_info("开始翻译", f"正在翻译SRT文件到{target_language}")
 
+    def browse_batch_folder(self, edit):
+        folder_path = self.get_folder_path("选择文件夹")
+        if folder_path:
+            edit.setText(folder_path)
+
+    def start_batch(self, mode):
+        input_dir = self.batch_input_edit.text().strip()
+        if not input_dir or not os.path.isdir(input_dir):
+            self.show_error("错误", "请选择有效的SRT文件夹")
+            return
+        if self.batch_worker is not None and self.batch_worker.isRunning():
+            self.show_warning("提示", "已有批量任务在运行，请等待完成或取消后再试")
+            return
+
+        output_dir = self.batch_output_edit.text().strip()
+        if not output_dir:
+            ts = datetime.now().strftime("%Y%m%d%H%M")
+            output_dir = os.path.join(os.getcwd(), 'SRT', f"batch-{ts}")
+
+        target_lang = self.LANGUAGE_MAP.get(self.language_combo.currentText(), "English")
+        worker = SRTBatchThread(input_dir, output_dir, mode, target_lang,
+                                self.translate_workers_spin.value())
+        worker.progress_updated.connect(self.progress_bar.setValue)
+        worker.log_updated.connect(self.batch_status_label.setText)
+        worker.finished.connect(self.on_batch_finished)
+        worker.start()
+
+        self.batch_worker = worker
+        self.worker_threads.append(worker)
+        self.show_info("开始批量处理", f"输出目录: {output_dir}")
+
+    def cancel_batch(self):
+        if self.batch_worker is not None and self.batch_worker.isRunning():
+            self.batch_worker.cancel()
+            self.show_warning("已取消", "正在停止批量处理，已完成的文件会保留")
+
+    def on_batch_finished(self, success, message):
+        if success:
+            self.show_success("批量完成", f"处理报告: {message}")
+        else:
+            self.show_error("批量处理未全部完成", message)
+        self.progress_bar.setValue(0)
+
     def on_srt_to_text_finished(self, success, message):
         if success:
             self.show_success("完成", f"SRT转文本完成: {message}")
@@ -2389,48 +5352,26 @@ class AdjustSubtitlePage(BasePage):
             self.show_error("错误", "请输入字幕内容")
             return
 
-        try:
-            srt_dir = os.path.join(os.getcwd(), 'SRT')
-            os.makedirs(srt_dir, exist_ok=True)
-
-            base_name = os.path.splitext(os.path.basename(srt_path))[0]
-            output_path = os.path.join(srt_dir, f"{base_name}-1.srt")
-
-            # 使用 chardet 检测文件编码
-            with open(srt_path, 'rb') as f:
-                raw = f.read()
-                detect_result = chardet.detect(raw)
-                enc = detect_result['encoding'] or 'utf-8'
-
-            # 使用检测到的编码读取文件内容
-            srt_content = raw.decode(enc, errors='replace')
-
-            # 提取时间轴
-            times = re.findall(r'(\d{2}:\d{2}:\d{2},\d{3} --> \d{2}:\d{2}:\d{2},\d{3})', srt_content)
-
-            # 获取新内容行
-            new_lines = content.split('\n')
-            new_lines = [line.strip() for line in new_lines if line.strip()]
-
-            if not new_lines:
-                self.show_error("错误", "字幕内容为空")
-                return
+        # 获取新内容行
+        new_lines = [line.strip() for line in content.split('\n') if line.strip()]
+        if not new_lines:
+            self.show_error("错误", "字幕内容为空")
+            return
 
-            if len(times) == 0:
-                self.show_error("错误", "无法从SRT文件中提取时间轴信息")
-                return
+        srt_dir = os.path.join(os.getcwd(), 'SRT')
+        os.makedirs(srt_dir, exist_ok=True)
 
-            # 生成新SRT文件
-            with open(output_path, 'w', encoding='utf-8') as f:
-                for i in range(min(len(new_lines), len(times))):
-                    f.write(f"{i+1}\n")
-                    f.write(f"{times[i]}\n")
-                    f.write(f"{new_lines[i]}\n\n")
+        base_name = os.path.splitext(os.path.basename(srt_path))[0]
+        output_path = os.path.join(srt_dir, f"{base_name}-1.srt")
 
-            self.show_success("完成", f"调整后的字幕文件已保存: {output_path}")
+        worker = SubtitleAdjustThread(srt_path, new_lines, output_path)
+        self.submit_job(f"调整字幕 {os.path.basename(srt_path)}", worker, self.on_adjust_finished)
 
-        except Exception as e:
-            self.show_error("错误", f"调整字幕失败: {str(e)}")
+    def on_adjust_finished(self, success, message):
+        if success:
+            self.show_success("完成", f"调整后的字幕文件已保存: {message}")
+        else:
+            self.show_error("错误", message)
 
 class MergeSubtitlePage(BasePage):
     """整合视频字幕页面"""
@@ -2533,9 +5474,27 @@ class MergeSubtitlePage(BasePage):
         merge_btn.clicked.connect(self.merge_video_subtitle)
         output_layout.addWidget(merge_btn, 0, 2)
 
+        self.chunked_checkbox = CheckBox("分段并行烧录（适合长视频）")
+        output_layout.addWidget(self.chunked_checkbox, 1, 0)
+
+        self.chunk_count_spin = SpinBox()
+        self.chunk_count_spin.setRange(2, 32)
+        self.chunk_count_spin.setValue(max(2, (os.cpu_count() or 4) // 2))
+        self.chunk_count_spin.setFixedHeight(35)
+        output_layout.addWidget(self.chunk_count_spin, 1, 1)
+
+        cancel_btn = PushButton(FluentIcon.CANCEL, "取消")
+        cancel_btn.clicked.connect(self.cancel_jobs)
+        output_layout.addWidget(cancel_btn, 1, 2)
+
         output_group.setLayout(output_layout)
         layout.addWidget(output_group)
 
+        # 进度条
+        self.progress_bar = ProgressBar()
+        self.progress_bar.setFixedHeight(20)
+        layout.addWidget(self.progress_bar)
+
         layout.addStretch()
 
     def browse_file(self, file_type):
@@ -2573,56 +5532,51 @@ class MergeSubtitlePage(BasePage):
             self.show_error("错误", "请确保所有文件路径都有效")
             return
 
-        try:
-            temp_dir = os.path.join(os.getcwd(), 'temp')
-            os.makedirs(temp_dir, exist_ok=True)
-
-            ts = datetime.now().strftime("%Y%m%d%H%M")
-            output_path = os.path.join(temp_dir, f"{output_name}-{ts}.mp4")
-
-            # 位置映射
-            pos_map = {"bottom": "2", "top": "8"}
-            alignment = pos_map.get(position, "2")
-
-            # 颜色格式转换（ASS格式：&HBBGGRR&）
-            def hex_to_ass_color(hex_color):
-                hex_color = hex_color.lstrip('#')
-                if len(hex_color) == 6:
-                    b, g, r = hex_color[4:6], hex_color[2:4], hex_color[0:2]
-                    return f"&H00{b}{g}{r}&"
-                elif len(hex_color) == 8:  # 带透明度
-                    a, b, g, r = hex_color[0:2], hex_color[6:8], hex_color[4:6], hex_color[2:4]
-                    return f"&H{a}{b}{g}{r}&"
-                else:
-                    return "&H000000&"
-
-            ass_color = hex_to_ass_color(bg_color)
-
-            # 字体名只要文件名不带扩展
-            fontname = os.path.splitext(os.path.basename(font_path))[0]
-
-            # 构造force_style
-            force_style = f"FontName={fontname},FontSize={font_size},OutlineColour={ass_color},Alignment={alignment}"
+        temp_dir = os.path.join(os.getcwd(), 'temp')
+        os.makedirs(temp_dir, exist_ok=True)
 
-            # FFmpeg命令
-            cmd = [
-                "ffmpeg", "-y", "-i", video_path, "-vf",
-                f"subtitles='{srt_path}':force_style='{force_style}'",
-                "-c:a", "copy", output_path
-            ]
+        ts = datetime.now().strftime("%Y%m%d%H%M")
+        output_path = os.path.join(temp_dir, f"{output_name}-{ts}.mp4")
+
+        force_style = self.build_force_style(font_path, font_size, bg_color, position)
+
+        # 分段并行烧录适合长视频，否则单次烧录
+        chunks = self.chunk_count_spin.value() if self.chunked_checkbox.isChecked() else 1
+        worker = SubtitleBurnThread(video_path, srt_path, output_path, force_style, chunks=chunks)
+        self.submit_job(f"整合字幕 {os.path.basename(video_path)}", worker, self.on_merge_finished)
+
+    def build_force_style(self, font_path, font_size, bg_color, position):
+        """构造 subtitles 滤镜的 force_style"""
+        # 位置映射
+        pos_map = {"bottom": "2", "top": "8"}
+        alignment = pos_map.get(position, "2")
+
+        # 颜色格式转换（ASS格式：&HBBGGRR&）
+        def hex_to_ass_color(hex_color):
+            hex_color = hex_color.lstrip('#')
+            if len(hex_color) == 6:
+                b, g, r = hex_color[4:6], hex_color[2:4], hex_color[0:2]
+                return f"&H00{b}{g}{r}&"
+            elif len(hex_color) == 8:  # 带透明度
+                a, b, g, r = hex_color[0:2], hex_color[6:8], hex_color[4:6], hex_color[2:4]
+                return f"&H{a}{b}{g}{r}&"
+            else:
+                return "&H000000&"
 
-            self.show_info("开始整合", "正在整合视频和字幕...")
+        ass_color = hex_to_ass_color(bg_color)
 
-            # 执行FFmpeg命令
-            result = subprocess.run(cmd, capture_output=True, text=True)
+        # 字体名只要文件名不带扩展
+        fontname = os.path.splitext(os.path.basename(font_path))[0]
 
-            if os.path.exists(output_path) and os.path.getsize(output_path) > 1024:
-                self.show_success("完成", f"带字幕视频已保存: {output_path}")
-            else:
-                self.show_error("错误", f"整合失败: {result.stderr}")
+        # 构造force_style
+        return f"FontName={fontname},FontSize={font_size},OutlineColour={ass_color},Alignment={alignment}"
 
-        except Exception as e:
-            self.show_error("错误", f"整合异常: {str(e)}")
+    def on_merge_finished(self, success, message):
+        if success:
+            self.show_success("完成", f"带字幕视频已保存: {message}")
+        else:
+            self.show_error("错误", f"整合失败: {message}")
+        self.progress_bar.setValue(0)
 
 # 主窗口类
 class MainWindow(FluentWindow):
@@ -2884,4 +5838,6 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    # 打包后的程序里进程池的子进程会重新启动本程序，需先交给 multiprocessing 处理
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字幕数据模型与流式 SRT 解析
+
+SubtitleTrack 用两个 array('q') 保存起止时间（毫秒整数），文本单独放在列表里，
+逐行解析、不依赖整文件正则；平移/缩放/合并/切片/序列化都在数组上完成，
+批量处理大量字幕文件时开销主要在 IO。
+"""
+import os
+import re
+import time
+import codecs
+import threading
+from array import array
+
+from chardet.universaldetector import UniversalDetector
+
+# 宽松时间戳：允许 1~2 位小时、逗号或点作为毫秒分隔、毫秒 1~3 位
+TIME_RE = re.compile(r"(\d{1,2}):(\d{2}):(\d{2})[,.](\d{1,3})")
+
+
+def parse_timestamp(value):
+    """SRT 时间戳转毫秒，格式不合法时返回 None"""
+    value = value.strip()
+    # 标准格式 HH:MM:SS,mmm 直接按位切片，避免正则开销
+    if len(value) == 12 and value[2] == ":" and value[5] == ":" and value[8] in ",.":
+        try:
+            return ((int(value[0:2]) * 60 + int(value[3:5])) * 60 + int(value[6:8])) * 1000 + int(value[9:12])
+        except ValueError:
+            pass
+    m = TIME_RE.match(value)
+    if not m:
+        return None
+    h, mi, s, ms = m.groups()
+    return ((int(h) * 60 + int(mi)) * 60 + int(s)) * 1000 + int(ms.ljust(3, "0"))
+
+
+def format_timestamp(ms):
+    """毫秒转 SRT 时间戳"""
+    ms = max(0, int(ms))
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+
+def parse_time_line(line):
+    """解析 "start --> end" 行，返回 (start_ms, end_ms)，不是时间行时返回 None"""
+    left, sep, right = line.partition("-->")
+    if not sep:
+        return None
+    start = parse_timestamp(left)
+    # 结束时间后可能跟位置信息（X1:... Y1:...），只取第一段
+    end = parse_timestamp(right.split()[0]) if right.strip() else None
+    if start is None or end is None:
+        return None
+    return start, end
+
+
+BOMS = (
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe\x00\x00", "utf-32"),
+    (b"\x00\x00\xfe\xff", "utf-32"),
+    (b"\xff\xfe", "utf-16"),
+    (b"\xfe\xff", "utf-16"),
+)
+# chardet 常把 GBK 内容判为 GB2312，统一升级为超集避免解码出错
+ENCODING_UPGRADES = {"gb2312": "gb18030", "gbk": "gb18030"}
+
+_encoding_cache = {}
+_encoding_cache_lock = threading.Lock()
+
+
+def sniff_encoding(path, prefix_bytes=64 * 1024, block_size=64 * 1024):
+    """检测文本文件编码，结果按 (路径, 修改时间, 大小) 缓存
+
+    先看 BOM，再做 UTF-8 严格增量解码（遇到非法字节立即停止）；
+    都不是时从 UTF-8 解码失败的位置起把 prefix_bytes 字节分块喂给 chardet，检测器有把握后提前结束。
+    文件开头是纯 ASCII、后面才出现中文时，检测的正是出错的那段内容；检测结果仍为 ascii
+    （或无结论）时按 gb18030 处理，它兼容 ASCII。
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _encoding_cache_lock:
+        if key in _encoding_cache:
+            return _encoding_cache[key]
+
+    with open(path, "rb") as f:
+        head = f.read(block_size)
+        encoding = next((name for bom, name in BOMS if head.startswith(bom)), None)
+
+        bad_offset = 0
+        if encoding is None:
+            decoder = codecs.getincrementaldecoder("utf-8")("strict")
+            block = head
+            consumed = 0
+            try:
+                while block:
+                    # 上一块末尾未完整的字节留在解码器缓冲中，出错位置相对于“缓冲 + 本块”
+                    buffered = len(decoder.getstate()[0])
+                    try:
+                        decoder.decode(block)
+                    except UnicodeDecodeError as e:
+                        bad_offset = max(0, consumed - buffered + e.start)
+                        raise
+                    consumed += len(block)
+                    block = f.read(block_size)
+                buffered = len(decoder.getstate()[0])
+                try:
+                    decoder.decode(b"", final=True)
+                except UnicodeDecodeError:
+                    bad_offset = max(0, consumed - buffered)
+                    raise
+                encoding = "utf-8"
+            except UnicodeDecodeError:
+                pass
+
+        if encoding is None:
+            detector = UniversalDetector()
+            f.seek(bad_offset)
+            fed = 0
+            while fed < prefix_bytes and not detector.done:
+                block = f.read(min(4096, prefix_bytes - fed))
+                if not block:
+                    break
+                detector.feed(block)
+                fed += len(block)
+            detector.close()
+            encoding = (detector.result.get("encoding") or "ascii").lower()
+            if encoding == "ascii":
+                encoding = "gb18030"  # UTF-8 已解码失败，ascii 结论不可信
+            encoding = ENCODING_UPGRADES.get(encoding, encoding)
+
+    with _encoding_cache_lock:
+        _encoding_cache[key] = encoding
+    return encoding
+
+
+class SubtitleTrack:
+    """字幕条目集合：starts/ends 为毫秒整数数组，texts 为对应文本（多行以 \\n 连接）"""
+
+    __slots__ = ("starts", "ends", "texts")
+
+    def __init__(self, starts=None, ends=None, texts=None):
+        self.starts = array("q", starts or ())
+        self.ends = array("q", ends or ())
+        self.texts = list(texts or ())
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends, self.texts)
+
+    def __getitem__(self, index):
+        return self.starts[index], self.ends[index], self.texts[index]
+
+    def append(self, start, end, text):
+        self.starts.append(int(start))
+        self.ends.append(int(end))
+        self.texts.append(text)
+
+    # ---- 解析 ----
+
+    @classmethod
+    def from_cues(cls, cues):
+        """由 [(start_ms, end_ms, text), ...] 构造"""
+        track = cls()
+        for start, end, text in cues:
+            track.append(start, end, text)
+        return track
+
+    @classmethod
+    def parse_lines(cls, lines):
+        """逐行解析 SRT，可直接传入打开的文件对象
+
+        以时间行作为条目起点，到下一个时间行之前的内容为文本；
+        序号行不参与定位，缺失或错乱的序号不影响结果。
+        """
+        track = cls()
+        block = None
+        for line in lines:
+            line = line.strip().lstrip("\ufeff")
+            times = parse_time_line(line) if "-->" in line else None
+            if times is None:
+                if block is not None:
+                    block.append(line)
+                continue
+            if block is not None:
+                track.texts.append(cls._block_text(block, next_cue=True))
+            track.starts.append(times[0])
+            track.ends.append(times[1])
+            block = []
+        if block is not None:
+            track.texts.append(cls._block_text(block, next_cue=False))
+        return track
+
+    @staticmethod
+    def _block_text(block, next_cue):
+        """从时间行之后的若干行中取出字幕文本"""
+        while block and not block[-1]:
+            block.pop()
+        # 后面还有条目时，块尾位于空行之后的纯数字行是下一条的序号
+        if next_cue and block and block[-1].isdigit() and (len(block) == 1 or not block[-2]):
+            block.pop()
+        return "\n".join(line for line in block if line)
+
+    @classmethod
+    def parse(cls, content):
+        return cls.parse_lines(content.splitlines())
+
+    @classmethod
+    def from_file(cls, path, encoding=None):
+        """流式读取 SRT 文件，未指定编码时自动检测"""
+        encoding = encoding or sniff_encoding(path)
+        with open(path, "r", encoding=encoding, errors="replace", newline="") as f:
+            return cls.parse_lines(f)
+
+    # ---- 序列化 ----
+
+    def to_srt(self):
+        """序列化为 SRT 文本，序号从 1 重新编排"""
+        fmt = format_timestamp
+        return "".join([
+            f"{i}\n{fmt(start)} --> {fmt(end)}\n{text}\n\n"
+            for i, (start, end, text) in enumerate(zip(self.starts, self.ends, self.texts), 1)
+        ])
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_srt())
+        return path
+
+    def plain_text(self, sep=""):
+        """所有条目的文本去掉空行后拼接"""
+        return sep.join(line.strip() for text in self.texts for line in text.split("\n") if line.strip())
+
+    # ---- 变换（均返回新对象，原对象不变）----
+
+    def copy(self):
+        return SubtitleTrack(self.starts, self.ends, self.texts)
+
+    def shift(self, offset_ms):
+        """整体平移，结果小于 0 时截到 0"""
+        offset_ms = int(offset_ms)
+        return SubtitleTrack(
+            array("q", [max(0, s + offset_ms) for s in self.starts]),
+            array("q", [max(0, e + offset_ms) for e in self.ends]),
+            self.texts,
+        )
+
+    def scale(self, factor, origin_ms=0):
+        """以 origin_ms 为原点按比例缩放时间轴（用于变速或帧率换算）"""
+        return SubtitleTrack(
+            array("q", [max(0, round(origin_ms + (s - origin_ms) * factor)) for s in self.starts]),
+            array("q", [max(0, round(origin_ms + (e - origin_ms) * factor)) for e in self.ends]),
+            self.texts,
+        )
+
+    def with_texts(self, texts):
+        """保留时间轴替换文本，条目数取两者较少者"""
+        count = min(len(self), len(texts))
+        return SubtitleTrack(self.starts[:count], self.ends[:count], list(texts[:count]))
+
+    def slice(self, start_ms, end_ms, rebase=True):
+        """截取与 [start_ms, end_ms) 有交集的条目并裁剪到区间内，rebase 时以 start_ms 为新零点"""
+        base = start_ms if rebase else 0
+        track = SubtitleTrack()
+        for s, e, text in self:
+            if e > start_ms and s < end_ms:
+                track.append(max(s, start_ms) - base, min(e, end_ms) - base, text)
+        return track
+
+    def merge(self, *others):
+        """与其他字幕合并，按开始时间稳定排序"""
+        merged = SubtitleTrack(self.starts, self.ends, self.texts)
+        for other in others:
+            merged.starts.extend(other.starts)
+            merged.ends.extend(other.ends)
+            merged.texts.extend(other.texts)
+        order = sorted(range(len(merged)), key=merged.starts.__getitem__)
+        return SubtitleTrack(
+            array("q", [merged.starts[i] for i in order]),
+            array("q", [merged.ends[i] for i in order]),
+            [merged.texts[i] for i in order],
+        )
+
+
+def srt_file_to_text(srt_path, output_path):
+    """SRT 转纯文本并写入 output_path，返回耗时（秒）
+
+    只依赖本模块，可直接提交给进程池批量执行。
+    """
+    start = time.perf_counter()
+    text = SubtitleTrack.from_file(srt_path).plain_text()
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return time.perf_counter() - start
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缩放合并滤镜性能对比：旧版 scale+zoom 表达式 vs zoompan 引擎各预设
+
+用法:
+    python zoom_benchmark.py [视频文件] [--zoom 1.2] [--encode]
+
+未指定视频时自动用 testsrc2 生成一段 10 秒 1080p 测试片段。
+默认只测滤镜（输出到 null），加 --encode 时包含 libx264 编码耗时。
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+from MCN import build_zoom_filter, probe, ZOOM_PRESETS
+
+
+def make_test_clip(path, seconds=10):
+    """生成 1080p 测试片段"""
+    cmd = [
+        "ffmpeg", "-y", "-f", "lavfi", "-i", f"testsrc2=size=1920x1080:rate=30:duration={seconds}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", path
+    ]
+    subprocess.run(cmd, capture_output=True, check=True)
+
+
+def run_case(clip, vf, encode):
+    """运行一次滤镜，返回 (耗时秒, 是否成功, 错误尾部)"""
+    cmd = ["ffmpeg", "-y", "-v", "error", "-i", clip, "-vf", vf, "-an"]
+    if encode:
+        cmd += ["-c:v", "libx264", "-preset", "fast", "-crf", "18", "-f", "mp4", os.devnull]
+    else:
+        cmd += ["-f", "null", "-"]
+    start = time.time()
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return time.time() - start, result.returncode == 0, result.stderr[-300:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缩放滤镜性能对比")
+    parser.add_argument("clip", nargs="?", help="测试视频（默认自动生成 1080p 片段）")
+    parser.add_argument("--zoom", type=float, default=1.2, help="缩放结束值")
+    parser.add_argument("--encode", action="store_true", help="包含 libx264 编码耗时")
+    args = parser.parse_args()
+
+    clip = args.clip
+    if not clip:
+        os.makedirs("temp", exist_ok=True)
+        clip = os.path.join("temp", "zoom_benchmark_1080p.mp4")
+        if not os.path.exists(clip):
+            print("🎬 生成 1080p 测试片段...")
+            make_test_clip(clip)
+
+    info = probe(clip)
+    if not info or not info["duration"] or not info["width"]:
+        print(f"❌ 无法读取视频信息: {clip}")
+        return 1
+
+    width, height = info["width"] // 2 * 2, info["height"] // 2 * 2
+    duration, fps = info["duration"], info["fps"]
+    print(f"📹 {clip}: {width}x{height}, {fps} fps, {duration:.2f} 秒\n")
+
+    cases = [("scale+zoom（旧版）", build_zoom_filter("scale+zoom", args.zoom, duration, fps, width, height))]
+    for preset in ZOOM_PRESETS:
+        cases.append((f"zoompan / {preset}",
+                      build_zoom_filter("scale+zoompan", args.zoom, duration, fps, width, height, preset)))
+
+    baseline = None
+    print(f"{'引擎':<22}{'耗时(秒)':>10}{'相对旧版':>10}")
+    for index, (name, vf) in enumerate(cases):
+        elapsed, ok, err = run_case(clip, vf, args.encode)
+        if not ok:
+            print(f"{name:<22}{'失败':>10}  {err.strip()}")
+            continue
+        if index == 0:
+            baseline = elapsed
+        ratio = f"{baseline / elapsed:>9.2f}x" if baseline else f"{'-':>10}"
+        print(f"{name:<22}{elapsed:>10.2f}{ratio}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())